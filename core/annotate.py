@@ -0,0 +1,78 @@
+# annotate.py
+
+"""
+Rasterization helpers for visual trace annotation.
+
+Box outlines are drawn straight into the frame buffer. When Numba is
+installed the kernel is JIT-compiled and runs in parallel over elements;
+otherwise the same code runs as plain NumPy slice writes.
+"""
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # Without Numba the kernel runs as ordinary Python
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+# Annotation colours (RGB)
+BOX_COLOR = (255, 0, 0)
+BOX_WIDTH = 2
+
+_warmed_up = False
+
+@njit(parallel=True, cache=True, fastmath=True)
+def draw_boxes(buf, bounds, color_r, color_g, color_b, width):
+    """
+    Draw rectangle outlines into an (H, W, 3) uint8 buffer.
+
+    bounds is an (N, 4) int32 array of x1, y1, x2, y2 rows. Matches PIL's
+    ``draw.rectangle(..., width=width)``: corners are inclusive and the
+    outline grows inwards. Boxes are clipped to the buffer.
+    """
+    height = buf.shape[0]
+    width_px = buf.shape[1]
+    for i in prange(bounds.shape[0]):
+        x1 = bounds[i, 0]
+        y1 = bounds[i, 1]
+        x2 = bounds[i, 2]
+        y2 = bounds[i, 3]
+        xa = max(x1, 0)
+        xb = min(x2, width_px - 1)
+        ya = max(y1, 0)
+        yb = min(y2, height - 1)
+        if xa > xb or ya > yb:
+            continue
+        # Clamp slice stops at 0 so edges lying off-screen never wrap around
+        top = max(min(y1 + width, height), 0)
+        bottom = max(y2 - width + 1, 0)
+        left = max(min(x1 + width, width_px), 0)
+        right = max(x2 - width + 1, 0)
+        for c, value in ((0, color_r), (1, color_g), (2, color_b)):
+            buf[ya:top, xa:xb + 1, c] = value
+            buf[bottom:yb + 1, xa:xb + 1, c] = value
+            buf[ya:yb + 1, xa:left, c] = value
+            buf[ya:yb + 1, right:xb + 1, c] = value
+
+def warm_up():
+    """Compile the drawing kernel ahead of the first frame."""
+    global _warmed_up
+    if _warmed_up or not (NUMBA_AVAILABLE and NUMPY_AVAILABLE):
+        return
+    # Match the strided RGB view of the RGBX canvas the recorder draws into
+    buf = np.zeros((4, 4, 4), dtype=np.uint8)[..., :3]
+    draw_boxes(buf, np.zeros((1, 4), dtype=np.int32), 0, 0, 0, 1)
+    _warmed_up = True
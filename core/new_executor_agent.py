@@ -8,15 +8,44 @@ except ImportError:
     reg = None
     suite_utils = None
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 import logging
+import random
 import time
 
+# Failure modes simulated by the mock executor
+_FAILURE_TYPES: Tuple[str, ...] = (
+    "element_not_found",
+    "timeout",
+    "ui_state_changed",
+    "permission_denied"
+)
+_MOCK_MSG_TMPL = "Mock execution of {} on {} completed successfully"
+
 class SimpleRunner:
     """A lightweight wrapper to give reset() and step() for tasks without EpisodeRunner."""
     def __init__(self, task):
         self.task = task
 
+        # Resolve the task's reset/step methods once and bind them as instance
+        # attributes, so runner.step(action) calls the task directly with no
+        # wrapper frame. The class-level methods remain as the fallback.
+        _reset = self._resolve(task, ('reset', 'start', 'initialize'))
+        _step = self._resolve(task, ('step', 'execute', 'run'))
+        if _reset is not None:
+            self.reset = _reset
+        if _step is not None:
+            self.step = _step
+
+    @staticmethod
+    def _resolve(task, names):
+        """Return the first bound method on task matching one of names."""
+        for name in names:
+            method = getattr(task, name, None)
+            if method is not None:
+                return method
+        return None
+
     def reset(self):
         # Try different init methods that may exist
         if hasattr(self.task, 'reset'):
@@ -52,25 +81,37 @@ class EnhancedExecutorAgent:
         self.logger = logging.getLogger(f"EnhancedExecutorAgent.{task_name}")
         
         if ANDROID_WORLD_AVAILABLE and reg:
-            # Try to initialize with real Android World
-            try:
-                self.task = reg.Umbrella().build_task('settings_wifi', is_safe=True)
-                self.runner = SimpleRunner(self.task)
-                self.real_mode = True
-                self.logger.info("Initialized with real Android World")
-            except Exception as e:
-                self.logger.warning(f"Failed to initialize Android World: {e}. Using mock mode.")
-                self._init_mock_mode()
+            # Defer building the Android World task until the first real step
+            self._task_factory = lambda: reg.Umbrella().build_task('settings_wifi', is_safe=True)
+            self.task = None
+            self.runner = None
+            self.real_mode = True
+            self.logger.info("Android World available; task will be built on first use")
         else:
             self._init_mock_mode()
     
     def _init_mock_mode(self):
         """Initialize in mock mode for testing without Android World."""
+        self._task_factory = None
         self.task = None
         self.runner = None
         self.real_mode = False
         self.logger.info("Initialized in mock mode")
     
+    def _ensure_runner(self) -> bool:
+        """Build the real-mode task and runner on first use; fall back to mock mode on failure."""
+        if self.runner is not None:
+            return True
+        try:
+            self.task = self._task_factory()
+            self.runner = SimpleRunner(self.task)
+            self.logger.info("Initialized with real Android World")
+            return True
+        except Exception as e:
+            self.logger.warning(f"Failed to initialize Android World: {e}. Using mock mode.")
+            self._init_mock_mode()
+            return False
+    
     def execute_step(self, step: Dict[str, Any], env_state: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute a single test step with enhanced error handling.
@@ -83,7 +124,7 @@ class EnhancedExecutorAgent:
             Execution result with success status and details
         """
         
-        if self.real_mode and self.runner:
+        if self.real_mode and self._ensure_runner():
             return self._execute_real_step(step, env_state)
         else:
             return self._execute_mock_step(step, env_state)
@@ -124,7 +165,6 @@ class EnhancedExecutorAgent:
         target = step.get("target", "unknown")
         
         # Simulate realistic execution with occasional failures
-        import random
         success_probability = 0.85  # 85% success rate
         
         # Add small delay to simulate real execution
@@ -137,18 +177,12 @@ class EnhancedExecutorAgent:
                 "success": True,
                 "action": action,
                 "target": target,
-                "message": f"Mock execution of {action} on {target} completed successfully",
+                "message": _MOCK_MSG_TMPL.format(action, target),
                 "execution_time": 0.1
             }
         else:
             # Simulate different types of failures
-            failure_types = [
-                "element_not_found",
-                "timeout",
-                "ui_state_changed",
-                "permission_denied"
-            ]
-            failure_type = random.choice(failure_types)
+            failure_type = random.choice(_FAILURE_TYPES)
             
             return {
                 "success": False,
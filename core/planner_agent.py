@@ -22,14 +22,19 @@ class PlannerAgent:
     def __init__(self, task_name: str = "settings_wifi"):
         self.task_name = task_name
         self.logger = logging.getLogger(f"PlannerAgent.{task_name}")
+        
+        # Initialize Android environment for context
+        self.env = AndroidEnv(task_name=task_name, enable_real_device=False)
+        
+        self.reset()
+        
+    def reset(self):
+        """Clear conversation and planning state so the agent can be reused for a new test."""
         self.conversation_history = []
         self.current_plan = None
         self.execution_context = {}
         self.modal_state_tracker = {}
         
-        # Initialize Android environment for context
-        self.env = AndroidEnv(task_name=task_name, enable_real_device=False)
-        
         # Dynamic planning state
         self.current_app_state = "unknown"
         self.navigation_stack = []
@@ -4,10 +4,18 @@ import os
 import json
 import time
 import base64
+import html
 import io
+import re
+import string
+import zlib
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Tuple, Union
 import logging
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import dataclass, field
+from annotate import draw_boxes, warm_up as warm_up_annotation, BOX_COLOR, BOX_WIDTH
 try:
     import numpy as np
     NUMPY_AVAILABLE = True
@@ -22,18 +30,211 @@ except ImportError:
     PIL_AVAILABLE = False
     Image = None
 
+try:
+    from PIL import ImageDraw, ImageFont
+    PIL_DRAW_AVAILABLE = True
+except ImportError:
+    PIL_DRAW_AVAILABLE = False
+    ImageDraw = None
+    ImageFont = None
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+    cv2 = None
+
+try:
+    import simplejpeg
+    SIMPLEJPEG_AVAILABLE = True
+except ImportError:
+    SIMPLEJPEG_AVAILABLE = False
+    simplejpeg = None
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+    xxhash = None
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+# Console summaries (key insights) go through this logger so their formatting
+# is skipped when INFO is disabled
+logger = logging.getLogger("qa_supervisor")
+
+_JSON_SCALARS = (str, int, float, bool, type(None))
+_JSON_ENCODER = json.JSONEncoder(indent=2)
+_COMPACT_JSON_ENCODER = json.JSONEncoder(separators=(",", ":"))
+_REPORT_BUFFER_SIZE = 1 << 18  # Large enough that most reports go out in one write
+_REPORTS_DIR = "reports"
+_REPORT_FORMATS = ("json", "md", "html")
+_REPORTS_DIR_ENSURED = False
+
+def _ensure_reports_dir() -> None:
+    """Create the reports directory on the first report write of the process."""
+    global _REPORTS_DIR_ENSURED
+    if not _REPORTS_DIR_ENSURED:
+        os.makedirs(_REPORTS_DIR, exist_ok=True)
+        _REPORTS_DIR_ENSURED = True
+
+def _sanitize(obj: Any) -> Any:
+    """
+    Convert obj to plain JSON types in one walk: NumPy values become Python
+    numbers and lists, tuples become lists, and anything else becomes str().
+    """
+    if isinstance(obj, _JSON_SCALARS):
+        return obj
+    if isinstance(obj, dict):
+        return {key if isinstance(key, _JSON_SCALARS) else str(key): _sanitize(value)
+                for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_sanitize(value) for value in obj]
+    if NUMPY_AVAILABLE:
+        if isinstance(obj, np.generic):
+            return obj.item()
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+    return str(obj)
+
+def _dump_json(obj: Any, path: str, pretty: bool = True):
+    """Write obj to path as JSON (indented unless pretty is False), using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        try:
+            payload = orjson.dumps(obj, default=str, option=option)
+        except TypeError:
+            # Dict keys orjson rejects (e.g. tuples); the sanitizing path handles them
+            payload = None
+        if payload is not None:
+            with open(path, 'wb') as f:
+                f.write(payload)
+            return
+    
+    encoder = _JSON_ENCODER if pretty else _COMPACT_JSON_ENCODER
+    # iterencode yields many tiny chunks; the large buffer coalesces them
+    with open(path, 'w', buffering=_REPORT_BUFFER_SIZE) as f:
+        for chunk in encoder.iterencode(_sanitize(obj)):
+            f.write(chunk)
+
+# Number of annotation canvases a recorder cycles through while frames are written
+_FRAME_RING_SIZE = 4
+
+@dataclass
+class _CanvasSlot:
+    """An RGBX annotation canvas and the background write that owns it, if any."""
+    buf: Any
+    rgb: Any
+    img: Any
+    draw: Any = None
+    future: Optional[Future] = None
+
+# Numeric per-frame fields; duplicate_of is -1 for frames that were written
+_FRAME_DTYPE = [('frame_id', 'i4'), ('timestamp', 'f8'), ('ui_element_count', 'i4'),
+                ('capture_scale', 'f8'), ('duplicate_of', 'i4')]
+
+class _FrameTable:
+    """
+    Frame metadata as a growable NumPy structured array, with file paths and
+    dimensions in parallel lists. Expanded to a list of dicts once per trace.
+    """
+    
+    def __init__(self, capacity: int = 256):
+        self.rows = np.empty(capacity, dtype=_FRAME_DTYPE)
+        self.size = 0
+        self.file_paths: List[str] = []
+        self.dimensions: List[Any] = []
+    
+    def append(self, frame_id: int, timestamp: float, file_path: str, ui_element_count: int,
+               dimensions: Any, capture_scale: float, duplicate_of: int = -1) -> int:
+        """Add a frame row, doubling capacity when full; returns the row index."""
+        if self.size == len(self.rows):
+            grown = np.empty(2 * len(self.rows), dtype=_FRAME_DTYPE)
+            grown[:self.size] = self.rows
+            self.rows = grown
+        
+        self.rows[self.size] = (frame_id, timestamp, ui_element_count, capture_scale, duplicate_of)
+        self.file_paths.append(file_path)
+        self.dimensions.append(dimensions)
+        self.size += 1
+        return self.size - 1
+    
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Expand the table into the trace's list-of-dicts frame format."""
+        frames = []
+        rows = self.rows[:self.size].tolist()
+        for (frame_id, timestamp, ui_element_count, capture_scale, duplicate_of), file_path, \
+                dimensions in zip(rows, self.file_paths, self.dimensions):
+            frame = {
+                "frame_id": frame_id,
+                "timestamp": timestamp,
+                "file_path": file_path,
+                "ui_element_count": ui_element_count,
+                "dimensions": dimensions,
+                "capture_scale": capture_scale
+            }
+            if duplicate_of >= 0:
+                frame["duplicate_of"] = duplicate_of
+            frames.append(frame)
+        return frames
+
 class VisualTraceRecorder:
     """
     Records visual traces of test execution including screenshots and UI states.
     Implements env.render(mode='rgb_array') functionality for visual recording.
     """
     
-    def __init__(self, trace_dir: str = "traces"):
+    def __init__(self, trace_dir: str = "traces", frame_format: str = "jpeg",
+                 jpeg_quality: int = 85, capture_scale: float = 1.0,
+                 png_size_budget: Optional[int] = None):
         self.trace_dir = trace_dir
+        self.frame_format = frame_format.lower()
+        self.jpeg_quality = jpeg_quality
+        self.capture_scale = capture_scale  # Saved frames are resized by this factor
+        self.png_size_budget = png_size_budget  # Target bytes per PNG frame, if any
+        self.png_compress_level = 1
+        self._png_level_selected = False
         self.current_trace = None
         self.trace_id = None
         self.logger = logging.getLogger("VisualTraceRecorder")
         
+        # References into current_trace and the frame path prefix, set per trace.
+        # With NumPy, frames go into a _FrameTable and reach current_trace at end_trace.
+        self._frames: Optional[List[Dict[str, Any]]] = None
+        self._frame_table: Optional[_FrameTable] = None
+        self._trace_meta: Optional[Dict[str, Any]] = None
+        self._frame_prefix: Optional[str] = None
+        self._frame_ext: Optional[str] = None
+        
+        # Ring of RGBX annotation canvases. Frames are annotated on the caller
+        # thread, then encoded and written by the I/O pool from their canvas.
+        self._ring: List[Optional[_CanvasSlot]] = [None] * _FRAME_RING_SIZE
+        self._ring_index = 0
+        self._canvas: Optional[_CanvasSlot] = None
+        # Created on the first background write and shut down by close()
+        self._io_pool: Optional[ThreadPoolExecutor] = None
+        
+        # Digest and frame table row of the last frame written, for skipping repeats
+        self._last_hash: Optional[int] = None
+        self._last_saved_row: Optional[int] = None
+        
+        # Load the annotation font once instead of on every frame
+        self._font = None
+        if PIL_DRAW_AVAILABLE:
+            try:
+                self._font = ImageFont.truetype("Arial.ttf", 20)
+            except Exception:
+                self._font = ImageFont.load_default()
+        
         # Ensure trace directory exists
         os.makedirs(trace_dir, exist_ok=True)
         
@@ -42,6 +243,9 @@ class VisualTraceRecorder:
         self.trace_id = f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{task_name}"
         trace_path = os.path.join(self.trace_dir, self.trace_id)
         os.makedirs(trace_path, exist_ok=True)
+        self._last_hash = None
+        self._last_saved_row = None
+        self._png_level_selected = False
         
         self.current_trace = {
             "trace_id": self.trace_id,
@@ -57,6 +261,14 @@ class VisualTraceRecorder:
                 "total_duration": 0
             }
         }
+        self._frames = self.current_trace["frames"]
+        self._frame_table = _FrameTable() if NUMPY_AVAILABLE else None
+        self._trace_meta = self.current_trace["metadata"]
+        self._frame_prefix = os.path.join(trace_path, "frame_")
+        self._frame_ext = "png" if self.frame_format == "png" else "jpg"
+        
+        # Compile the box-drawing kernel now rather than on the first frame
+        warm_up_annotation()
         
         self.logger.info(f"Started visual trace recording: {self.trace_id}")
         return self.trace_id
@@ -88,7 +300,7 @@ class VisualTraceRecorder:
             if isinstance(pixels, list):
                 pixels = np.array(pixels, dtype=np.uint8)
         
-        frame_id = self.current_trace["metadata"]["frame_count"]
+        frame_id = self._trace_meta["frame_count"]
         timestamp = time.time()
         
         if mode == 'rgb_array':
@@ -96,80 +308,259 @@ class VisualTraceRecorder:
             return pixels
             
         elif mode == 'human' or mode == 'save':
+            # In save mode, an unchanged screen just points back at the frame already written
+            frame_hash = self._frame_hash(pixels, ui_elements) if mode == 'save' else None
+            if frame_hash is not None and frame_hash == self._last_hash:
+                # Hashing needs NumPy, so the frame table is always in use here
+                table = self._frame_table
+                row = self._last_saved_row
+                original = table.rows[row]
+                file_path = table.file_paths[row]
+                table.append(frame_id, timestamp, file_path, len(ui_elements),
+                             table.dimensions[row], original['capture_scale'],
+                             duplicate_of=original['frame_id'])
+                self._trace_meta["frame_count"] += 1
+                return file_path
+            
             # Save annotated screenshot with UI elements marked
-            annotated_image = self._annotate_screenshot(pixels, ui_elements)
+            scaled_pixels, scale = self._downscale(pixels)
+            annotated_image = self._annotate_screenshot(scaled_pixels, ui_elements, scale)
             
             # Save frame
-            trace_path = self.current_trace["metadata"]["trace_path"]
-            frame_filename = f"frame_{frame_id:04d}.png"
-            frame_path = os.path.join(trace_path, frame_filename)
+            frame_path = f"{self._frame_prefix}{frame_id:04d}.{self._frame_ext}"
             
-            if PIL_AVAILABLE and annotated_image is not None:
-                if isinstance(annotated_image, np.ndarray):
-                    Image.fromarray(annotated_image).save(frame_path)
-                else:
-                    annotated_image.save(frame_path)
-            elif NUMPY_AVAILABLE:
+            if (self.frame_format == "png" and self.png_size_budget
+                    and not self._png_level_selected):
+                self._select_png_compress_level(
+                    annotated_image if annotated_image is not None else scaled_pixels)
+            
+            if self._canvas is not None and annotated_image is self._canvas.rgb:
+                # Encode and write in the background; the canvas is not reused until done
+                slot = self._canvas
+                if self._io_pool is None:
+                    self._io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="trace_io")
+                slot.future = self._io_pool.submit(self._encode_and_write, slot, frame_path)
+            elif annotated_image is not None:
+                self._save_frame(annotated_image, frame_path)
+            else:
                 # Fallback: save raw pixels
-                Image.fromarray(pixels).save(frame_path)
+                self._save_frame(scaled_pixels, frame_path)
             
             # Record frame metadata
-            self.current_trace["frames"].append({
-                "frame_id": frame_id,
-                "timestamp": timestamp,
-                "file_path": frame_path,
-                "ui_element_count": len(ui_elements),
-                "dimensions": pixels.shape if hasattr(pixels, 'shape') else None
-            })
+            dimensions = pixels.shape if hasattr(pixels, 'shape') else None
+            if self._frame_table is not None:
+                self._last_saved_row = self._frame_table.append(
+                    frame_id, timestamp, frame_path, len(ui_elements), dimensions, scale)
+            else:
+                self._frames.append({
+                    "frame_id": frame_id,
+                    "timestamp": timestamp,
+                    "file_path": frame_path,
+                    "ui_element_count": len(ui_elements),
+                    "dimensions": dimensions,
+                    "capture_scale": scale
+                })
+            self._last_hash = frame_hash
             
-            self.current_trace["metadata"]["frame_count"] += 1
+            self._trace_meta["frame_count"] += 1
             
             return frame_path if mode == 'save' else annotated_image
     
-    def _annotate_screenshot(self, pixels: Any, ui_elements: List[Dict]) -> Optional[Any]:
-        """Annotate screenshot with UI element bounding boxes and labels."""
-        if not NUMPY_AVAILABLE or not PIL_AVAILABLE:
+    def _frame_hash(self, pixels: Any, ui_elements: List[Dict]) -> Optional[int]:
+        """Cheap digest of a frame's pixels plus the element boxes and text drawn over them."""
+        if not NUMPY_AVAILABLE or not isinstance(pixels, np.ndarray):
+            return None
+        
+        data = np.ascontiguousarray(pixels)
+        if XXHASH_AVAILABLE:
+            digest = xxhash.xxh3_64_intdigest(data)
+        else:
+            digest = zlib.crc32(data)
+        
+        try:
+            overlay = tuple((tuple(e.get("bounds", ())), e.get("text")) for e in ui_elements)
+            return hash((digest, overlay))
+        except TypeError:
+            # Unhashable element fields; treat the frame as new
+            return None
+    
+    def _downscale(self, pixels: Any):
+        """Resize pixels by capture_scale for saving; returns (pixels, scale actually applied)."""
+        scale = self.capture_scale
+        if (scale == 1.0 or not NUMPY_AVAILABLE or not isinstance(pixels, np.ndarray)
+                or pixels.ndim != 3):
+            return pixels, 1.0
+        
+        height, width = pixels.shape[:2]
+        size = (max(int(width * scale), 1), max(int(height * scale), 1))
+        if CV2_AVAILABLE:
+            return cv2.resize(pixels, size, interpolation=cv2.INTER_AREA), scale
+        if PIL_AVAILABLE:
+            image = Image.fromarray(np.ascontiguousarray(pixels[..., :3], dtype=np.uint8))
+            return np.asarray(image.resize(size, Image.BOX)), scale
+        return pixels, 1.0
+    
+    def _select_png_compress_level(self, image: Any):
+        """Pick the lowest PNG compress level whose output fits png_size_budget."""
+        self._png_level_selected = True
+        if not PIL_AVAILABLE:
+            return
+        if NUMPY_AVAILABLE and isinstance(image, np.ndarray):
+            if image.ndim != 3:
+                return
+            image = Image.fromarray(np.ascontiguousarray(image[..., :3], dtype=np.uint8))
+        elif not hasattr(image, 'save'):
+            return
+        
+        for level in range(1, 10):
+            buffer = io.BytesIO()
+            image.save(buffer, format='PNG', optimize=False, compress_level=level)
+            if buffer.tell() <= self.png_size_budget:
+                break
+        self.png_compress_level = level
+        self.logger.info(f"Using PNG compress level {level} ({buffer.tell()} bytes per frame)")
+    
+    def _encode_and_write(self, slot: _CanvasSlot, frame_path: str):
+        """Write an annotated canvas to disk; runs on the I/O pool."""
+        try:
+            self._save_frame(slot.buf, frame_path, slot.img)
+        except Exception as e:
+            self.logger.error(f"Failed to write frame {frame_path}: {e}")
+    
+    def _drain_pending_frames(self):
+        """Block until every frame handed to the I/O pool has been written."""
+        for slot in self._ring:
+            if slot is not None and slot.future is not None:
+                slot.future.result()
+                slot.future = None
+    
+    def close(self):
+        """Finish pending frame writes and stop the I/O threads; a later frame starts them again."""
+        self._drain_pending_frames()
+        if self._io_pool is not None:
+            self._io_pool.shutdown(wait=True)
+            self._io_pool = None
+    
+    def _save_frame(self, image: Any, frame_path: str, pil_image: Any = None):
+        """
+        Encode a frame to disk as JPEG (simplejpeg when available) or fast PNG.
+        
+        pil_image, if given, is a Pillow Image already wrapping image's RGBX pixels.
+        """
+        if NUMPY_AVAILABLE and isinstance(image, np.ndarray):
+            arr = np.ascontiguousarray(image, dtype=np.uint8)
+            channels = arr.shape[2] if arr.ndim == 3 else 0
+            if (self.frame_format != "png" and SIMPLEJPEG_AVAILABLE
+                    and channels in (3, 4)):
+                jpg_bytes = simplejpeg.encode_jpeg(arr, quality=self.jpeg_quality,
+                                                   colorspace='RGB' if channels == 3 else 'RGBX',
+                                                   fastdct=True)
+                with open(frame_path, 'wb') as f:
+                    f.write(jpg_bytes)
+                return
+            if not PIL_AVAILABLE:
+                return
+            if channels == 4:
+                # Wrap RGBX pixels in place instead of copying out an RGB slice
+                if pil_image is not None:
+                    image = pil_image
+                else:
+                    image = Image.frombuffer('RGBX', (arr.shape[1], arr.shape[0]), arr,
+                                             'raw', 'RGBX', 0, 1)
+            else:
+                image = Image.fromarray(arr)
+        elif not PIL_AVAILABLE or not hasattr(image, 'save'):
+            return
+        
+        if self.frame_format == "png":
+            if image.mode == 'RGBX':
+                # PNG has no RGBX mode, so this path pays for one RGB copy
+                image = image.convert('RGB')
+            # Skip Pillow's optimize pass; flat UI screenshots compress fine at low levels
+            image.save(frame_path, format='PNG', optimize=False,
+                       compress_level=self.png_compress_level)
+        else:
+            image.save(frame_path, format='JPEG', quality=self.jpeg_quality)
+    
+    def _ensure_canvas(self, height: int, width: int) -> _CanvasSlot:
+        """
+        Advance to the next canvas in the ring, waiting for its previous frame
+        to be written and reallocating it if the frame size changed.
+        """
+        index = self._ring_index
+        self._ring_index = (index + 1) % len(self._ring)
+        
+        slot = self._ring[index]
+        if slot is not None and slot.future is not None:
+            slot.future.result()
+            slot.future = None
+        
+        if slot is None or slot.buf.shape[:2] != (height, width):
+            buf = np.empty((height, width, 4), dtype=np.uint8)
+            buf[..., 3] = 255
+            # Pillow can only alias 4-byte-per-pixel buffers, hence RGBX rather than RGB
+            img = Image.frombuffer('RGBX', (width, height), buf, 'raw', 'RGBX', 0, 1)
+            img.readonly = 0
+            slot = _CanvasSlot(buf=buf, rgb=buf[..., :3], img=img)
+            self._ring[index] = slot
+        
+        self._canvas = slot
+        return slot
+    
+    def _annotate_screenshot(self, pixels: Any, ui_elements: List[Dict],
+                             scale: float = 1.0) -> Optional[Any]:
+        """
+        Annotate screenshot with UI element bounding boxes and labels.
+        
+        Element bounds are in device coordinates and are multiplied by scale
+        when pixels has been resized.
+        
+        Drawing happens in place on a ring of canvases reused across frames,
+        so the returned array is only valid until its canvas comes round again.
+        """
+        if not NUMPY_AVAILABLE or not PIL_AVAILABLE or not PIL_DRAW_AVAILABLE:
             return pixels
             
         try:
-            # Convert to PIL Image for annotation
-            if isinstance(pixels, np.ndarray) and len(pixels.shape) == 3:
-                img = Image.fromarray(pixels.astype(np.uint8))
-            else:
+            if not (isinstance(pixels, np.ndarray) and len(pixels.shape) == 3):
                 return pixels
-                
-            # Import drawing capabilities
-            try:
-                from PIL import ImageDraw, ImageFont
-            except ImportError:
-                return np.array(img)
             
-            draw = ImageDraw.Draw(img)
+            slot = self._ensure_canvas(pixels.shape[0], pixels.shape[1])
+            np.copyto(slot.rgb, pixels[..., :3], casting='unsafe')
+            if slot.draw is None:
+                slot.draw = ImageDraw.Draw(slot.img)
+            draw = slot.draw
+            font = self._font
             
-            # Try to load a font
-            try:
-                font = ImageFont.truetype("Arial.ttf", 20)
-            except:
-                font = ImageFont.load_default()
-            
-            # Draw UI element bounding boxes
-            for i, element in enumerate(ui_elements):
-                if "bounds" in element:
-                    bounds = element["bounds"]
-                    if len(bounds) >= 4:
-                        x1, y1, x2, y2 = bounds[:4]
-                        # Draw bounding box
-                        draw.rectangle([x1, y1, x2, y2], outline="red", width=2)
-                        
-                        # Draw element index
-                        draw.text((x1, y1-25), str(i), fill="red", font=font)
-                        
-                        # Draw element text if available
-                        if "text" in element and element["text"]:
-                            text = element["text"][:15] + "..." if len(element["text"]) > 15 else element["text"]
-                            draw.text((x1, y1-5), text, fill="blue", font=font)
-            
-            return np.array(img)
+            # Elements with usable bounds; their boxes go into one (N, 4) int32 array
+            boxed = [(i, element) for i, element in enumerate(ui_elements)
+                     if len(element.get("bounds") or ()) >= 4]
+            if not boxed:
+                return slot.rgb
+            
+            count = 4 * len(boxed)
+            coords = (b for _, element in boxed for b in element["bounds"][:4])
+            if scale == 1.0:
+                bounds = np.fromiter(coords, dtype=np.int32, count=count).reshape(-1, 4)
+            else:
+                bounds = np.fromiter(coords, dtype=np.float64, count=count).reshape(-1, 4)
+                bounds = (bounds * scale).astype(np.int32)
+            
+            # Draw bounding boxes straight into the canvas
+            draw_boxes(slot.rgb, bounds, *BOX_COLOR, BOX_WIDTH)
+            
+            # Only the text labels go through PIL
+            for (i, element), (x1, y1) in zip(boxed, bounds[:, :2].tolist()):
+                # Draw element index
+                draw.text((x1, y1-25), str(i), fill="red", font=font)
+                
+                # Draw element text if available
+                element_text = element.get("text")
+                if element_text:
+                    text = element_text[:15] + "..." if len(element_text) > 15 else element_text
+                    draw.text((x1, y1-5), text, fill="blue", font=font)
+            
+            return slot.rgb
             
         except Exception as e:
             self.logger.error(f"Failed to annotate screenshot: {e}")
@@ -186,7 +577,7 @@ class VisualTraceRecorder:
             "agent": agent_name,
             "action": action,
             "result": result,
-            "frame_id": self.current_trace["metadata"]["frame_count"]
+            "frame_id": self._trace_meta["frame_count"]
         }
         
         self.current_trace["agent_actions"].append(action_record)
@@ -200,34 +591,103 @@ class VisualTraceRecorder:
             "timestamp": time.time(),
             "ui_elements": ui_state.get("ui_elements", []),
             "screen_info": ui_state.get("screen_info", {}),
-            "frame_id": self.current_trace["metadata"]["frame_count"]
+            "frame_id": self._trace_meta["frame_count"]
         }
         
         self.current_trace["ui_states"].append(ui_record)
     
-    def end_trace(self) -> Optional[str]:
-        """End current trace and save metadata."""
+    def end_trace(self) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        End current trace and save metadata.
+        
+        Returns (trace_id, trace) so callers can keep working with the finished
+        trace dict; both are None when no trace was active.
+        """
         if not self.current_trace:
-            return None
+            return None, None
             
         self.current_trace["end_time"] = time.time()
         self.current_trace["metadata"]["total_duration"] = (
             self.current_trace["end_time"] - self.current_trace["start_time"]
         )
         
+        # Make sure every frame is on disk before the metadata points at it
+        self._drain_pending_frames()
+        if self._frame_table is not None:
+            self.current_trace["frames"] = self._frame_table.to_dicts()
+        
         # Save trace metadata
         trace_path = self.current_trace["metadata"]["trace_path"]
         metadata_path = os.path.join(trace_path, "trace_metadata.json")
         
-        with open(metadata_path, 'w') as f:
-            json.dump(self.current_trace, f, indent=2, default=str)
+        _dump_json(self.current_trace, metadata_path)
         
         trace_id = self.trace_id
+        trace = self.current_trace
         self.current_trace = None
         self.trace_id = None
+        self._frames = None
+        self._frame_table = None
+        self._trace_meta = None
         
         self.logger.info(f"Ended visual trace recording: {trace_id}")
-        return trace_id
+        return trace_id, trace
+
+@dataclass
+class _LogIndex:
+    """Agent decision logs bucketed in a single pass for the analysis methods."""
+    total: int = 0
+    by_agent: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    failed: List[Dict[str, Any]] = field(default_factory=list)
+    timeouts: List[Dict[str, Any]] = field(default_factory=list)
+    modal_blocks: List[Dict[str, Any]] = field(default_factory=list)
+    recovery: List[Dict[str, Any]] = field(default_factory=list)
+    replanning: List[Dict[str, Any]] = field(default_factory=list)
+    false_positives: List[Dict[str, Any]] = field(default_factory=list)
+
+def _build_log_index(agent_logs: List[Dict[str, Any]]) -> _LogIndex:
+    """
+    Index agent logs by agent, failure status and event kind in one pass.
+    
+    Event kinds come from the structured ``kind`` field set by
+    ``SupervisorAgent.record_agent_decision``. Logs without it are
+    stringified once here rather than once per analysis predicate.
+    """
+    index = _LogIndex(total=len(agent_logs))
+    by_agent = index.by_agent
+    
+    for log in agent_logs:
+        by_agent.setdefault(log.get("agent"), []).append(log)
+        
+        if log.get("status") == "failed":
+            index.failed.append(log)
+        if "replanning" in log.get("action", ""):
+            index.replanning.append(log)
+        
+        kind = log.get("kind")
+        if kind is not None:
+            is_timeout = kind == "timeout"
+            is_modal_block = kind == "blocking_modal"
+            is_recovery = kind in ("recovery", "retry")
+            is_false_positive = kind == "false_positive"
+        else:
+            # Compatibility path for logs recorded without a kind
+            text = str(log)
+            is_timeout = "timeout" in text.lower()
+            is_modal_block = "blocking_modal" in text
+            is_recovery = "recovery" in text or "retry" in text
+            is_false_positive = "false_positive" in text
+        
+        if is_timeout:
+            index.timeouts.append(log)
+        if is_modal_block:
+            index.modal_blocks.append(log)
+        if is_recovery:
+            index.recovery.append(log)
+        if is_false_positive:
+            index.false_positives.append(log)
+    
+    return index
 
 class MockLLMProcessor:
     """
@@ -235,25 +695,29 @@ class MockLLMProcessor:
     Provides realistic AI-powered analysis without requiring actual API calls.
     """
     
-    def __init__(self):
+    def __init__(self, simulate_latency: float = 0.0):
         self.model_name = "gemini-2.5-flash-mock"
+        self.simulate_latency = simulate_latency  # Seconds to sleep per analysis, for demos
         self.logger = logging.getLogger("MockLLMProcessor")
     
     def analyze_test_trace(self, trace_data: Dict[str, Any], 
-                          agent_logs: List[Dict[str, Any]]) -> Dict[str, Any]:
+                          agent_logs: List[Dict[str, Any]],
+                          log_index: Optional[_LogIndex] = None) -> Dict[str, Any]:
         """
         Analyze complete test trace and provide AI-powered insights.
         
         Args:
             trace_data: Visual trace data with screenshots and UI states
             agent_logs: Agent decision logs from all agents
+            log_index: Prebuilt index of agent_logs; built here when omitted
             
         Returns:
             Analysis with prompt improvements, failure detection, and recommendations
         """
         
-        # Simulate processing time
-        time.sleep(0.5)
+        # Simulate processing time only when asked to
+        if self.simulate_latency > 0:
+            time.sleep(self.simulate_latency)
         
         analysis_start = time.time()
         
@@ -262,6 +726,9 @@ class MockLLMProcessor:
         action_count = len(trace_data.get("agent_actions", []))
         duration = trace_data.get("metadata", {}).get("total_duration", 0)
         
+        if log_index is None:
+            log_index = _build_log_index(agent_logs)
+        
         # Simulate AI analysis based on trace patterns
         analysis_result = {
             "analysis_id": f"analysis_{int(time.time())}",
@@ -273,22 +740,22 @@ class MockLLMProcessor:
                 "duration_seconds": duration,
                 "actions_per_minute": (action_count / (duration / 60)) if duration > 0 else 0
             },
-            "prompt_improvements": self._suggest_prompt_improvements(trace_data, agent_logs),
-            "failure_analysis": self._analyze_failures(trace_data, agent_logs),
+            "prompt_improvements": self._suggest_prompt_improvements(trace_data, log_index),
+            "failure_analysis": self._analyze_failures(trace_data, log_index),
             "test_coverage": self._analyze_test_coverage(trace_data, agent_logs),
-            "agent_performance": self._analyze_agent_performance(agent_logs),
-            "recommendations": self._generate_recommendations(trace_data, agent_logs),
+            "agent_performance": self._analyze_agent_performance(log_index),
+            "recommendations": self._generate_recommendations(trace_data, log_index),
             "processing_time": time.time() - analysis_start
         }
         
         return analysis_result
     
-    def _suggest_prompt_improvements(self, trace_data: Dict, agent_logs: List[Dict]) -> List[Dict[str, Any]]:
+    def _suggest_prompt_improvements(self, trace_data: Dict, log_index: _LogIndex) -> List[Dict[str, Any]]:
         """Suggest improvements to agent prompts based on observed behavior."""
         improvements = []
         
         # Analyze planner effectiveness
-        planner_logs = [log for log in agent_logs if log.get("agent") == "PlannerAgent"]
+        planner_logs = log_index.by_agent.get("PlannerAgent", [])
         if planner_logs:
             replanning_count = sum(1 for log in planner_logs if "replanning" in log.get("action", ""))
             if replanning_count > 2:
@@ -301,7 +768,7 @@ class MockLLMProcessor:
                 })
         
         # Analyze executor effectiveness
-        executor_logs = [log for log in agent_logs if log.get("agent") == "ExecutorAgent"]
+        executor_logs = log_index.by_agent.get("ExecutorAgent", [])
         failed_actions = [log for log in executor_logs if log.get("status") == "failed"]
         if len(failed_actions) > 1:
             improvements.append({
@@ -313,11 +780,11 @@ class MockLLMProcessor:
             })
         
         # Analyze verifier effectiveness
-        verifier_logs = [log for log in agent_logs if log.get("agent") == "VerifierAgent"]
+        verifier_logs = log_index.by_agent.get("VerifierAgent", [])
         if verifier_logs:
-            false_positives = [log for log in verifier_logs 
-                             if log.get("verification_result", {}).get("status") == "FAIL" 
-                             and "false_positive" in str(log)]
+            false_positives = [log for log in log_index.false_positives
+                             if log.get("agent") == "VerifierAgent"
+                             and log.get("verification_result", {}).get("status") == "FAIL"]
             if false_positives:
                 improvements.append({
                     "agent": "VerifierAgent",
@@ -329,7 +796,7 @@ class MockLLMProcessor:
         
         return improvements
     
-    def _analyze_failures(self, trace_data: Dict, agent_logs: List[Dict]) -> Dict[str, Any]:
+    def _analyze_failures(self, trace_data: Dict, log_index: _LogIndex) -> Dict[str, Any]:
         """Analyze failures and their root causes."""
         
         failures = []
@@ -337,7 +804,15 @@ class MockLLMProcessor:
         # Check for UI element detection failures
         ui_failures = 0
         for action in trace_data.get("agent_actions", []):
-            if "element_not_found" in str(action.get("result", {})):
+            result = action.get("result", {})
+            kind = None
+            if isinstance(result, dict):
+                kind = result.get("kind", result.get("failure_type"))
+            if kind is not None:
+                element_missing = kind == "element_not_found"
+            else:
+                element_missing = "element_not_found" in str(result)
+            if element_missing:
                 ui_failures += 1
                 failures.append({
                     "type": "element_detection_failure",
@@ -347,7 +822,7 @@ class MockLLMProcessor:
                 })
         
         # Check for timeout failures
-        timeout_failures = [log for log in agent_logs if "timeout" in str(log).lower()]
+        timeout_failures = log_index.timeouts
         for failure in timeout_failures:
             failures.append({
                 "type": "timeout_failure",
@@ -357,7 +832,7 @@ class MockLLMProcessor:
             })
         
         # Check for modal blocking issues
-        modal_blocks = [log for log in agent_logs if "blocking_modal" in str(log)]
+        modal_blocks = log_index.modal_blocks
         for block in modal_blocks:
             failures.append({
                 "type": "modal_blocking",
@@ -374,7 +849,7 @@ class MockLLMProcessor:
                 "modal_blocking": len(modal_blocks)
             },
             "failure_details": failures,
-            "failure_rate": len(failures) / max(len(agent_logs), 1)
+            "failure_rate": len(failures) / max(log_index.total, 1)
         }
     
     def _analyze_test_coverage(self, trace_data: Dict, agent_logs: List[Dict]) -> Dict[str, Any]:
@@ -418,24 +893,29 @@ class MockLLMProcessor:
             ]
         }
     
-    def _analyze_agent_performance(self, agent_logs: List[Dict]) -> Dict[str, Any]:
+    def _analyze_agent_performance(self, log_index: _LogIndex) -> Dict[str, Any]:
         """Analyze individual agent performance metrics."""
         
         performance = {}
         
         for agent_type in ["PlannerAgent", "ExecutorAgent", "VerifierAgent"]:
-            agent_actions = [log for log in agent_logs if log.get("agent") == agent_type]
+            agent_actions = log_index.by_agent.get(agent_type, [])
             
             if agent_actions:
-                # Calculate success rate
-                successful_actions = [log for log in agent_actions 
-                                    if log.get("status") != "failed"]
-                success_rate = len(successful_actions) / len(agent_actions)
+                # Accumulate success count and processing times in one pass
+                successful_count = 0
+                time_total = 0.0
+                time_count = 0
+                for log in agent_actions:
+                    if log.get("status") != "failed":
+                        successful_count += 1
+                    processing_time = log.get("processing_time")
+                    if processing_time:
+                        time_total += processing_time
+                        time_count += 1
                 
-                # Calculate average processing time
-                processing_times = [log.get("processing_time", 0) for log in agent_actions 
-                                  if log.get("processing_time")]
-                avg_processing_time = sum(processing_times) / len(processing_times) if processing_times else 0
+                success_rate = successful_count / len(agent_actions)
+                avg_processing_time = time_total / time_count if time_count else 0
                 
                 performance[agent_type] = {
                     "total_actions": len(agent_actions),
@@ -446,7 +926,7 @@ class MockLLMProcessor:
         
         return performance
     
-    def _generate_recommendations(self, trace_data: Dict, agent_logs: List[Dict]) -> List[Dict[str, Any]]:
+    def _generate_recommendations(self, trace_data: Dict, log_index: _LogIndex) -> List[Dict[str, Any]]:
         """Generate actionable recommendations for improvement."""
         
         recommendations = []
@@ -467,7 +947,7 @@ class MockLLMProcessor:
             })
         
         # Reliability recommendations
-        failed_actions = [log for log in agent_logs if log.get("status") == "failed"]
+        failed_actions = log_index.failed
         if len(failed_actions) > 2:
             recommendations.append({
                 "category": "reliability",
@@ -498,6 +978,81 @@ class MockLLMProcessor:
         
         return recommendations
 
+# Features a comprehensive run should exercise, and the step keywords that mark them tested
+_EXPECTED_FEATURES = frozenset({
+    "wifi_functionality", "toggle_operations", "app_navigation",
+    "error_handling", "state_persistence", "ui_responsiveness"
+})
+_FEATURE_KEYWORDS = {
+    "wifi": "wifi_functionality",
+    "toggle": "toggle_operations",
+    "navigation": "app_navigation"
+}
+_FEATURE_KEYWORD_RE = re.compile("|".join(_FEATURE_KEYWORDS), re.IGNORECASE)
+
+# Report header fields, fetched in one call by the markdown writer
+_REPORT_HEADER = itemgetter("test_goal", "overall_status", "timestamp", "session_id")
+_GET_RESULT = itemgetter("result")
+
+# Per-step status markers, keyed by whether the step passed
+_MD_STATUS = {True: "✅", False: "❌"}
+_HTML_CLASS = {True: "status-pass", False: "status-fail"}
+
+# Static skeleton of the visual HTML report; only the header fields vary per report
+_HTML_HEADER = string.Template("""
+<!DOCTYPE html>
+<html>
+<head>
+    <title>QA Visual Test Report</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; }
+        .header { background: #f0f0f0; padding: 20px; border-radius: 5px; }
+        .metric { display: inline-block; margin: 10px; padding: 10px; background: #e8f4fd; border-radius: 3px; }
+        .frame { margin: 10px 0; padding: 10px; border: 1px solid #ddd; }
+        .status-pass { color: green; font-weight: bold; }
+        .status-fail { color: red; font-weight: bold; }
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>QA Visual Test Report</h1>
+        <p><strong>Test Goal:</strong> $goal</p>
+        <p><strong>Overall Result:</strong> 
+           <span class="status-$status_lc">$status</span></p>
+        <p><strong>Session ID:</strong> $session</p>
+    </div>
+    
+    <h2>Performance Metrics</h2>
+    <div class="metrics">
+""")
+_HTML_STEPS_HEADER = """
+    </div>
+    
+    <h2>Visual Trace</h2>
+    <p>Screenshots and UI states captured during test execution would be displayed here.</p>
+    
+    <h2>Test Steps</h2>
+"""
+_HTML_FOOTER = """
+</body>
+</html>
+"""
+
+def _result_statuses(results: List[Dict]) -> List[Any]:
+    """Status of each result, via the C-level itemgetter when every result has one."""
+    try:
+        return list(map(_GET_RESULT, results))
+    except KeyError:
+        return [r.get("result") for r in results]
+
+def _extract_ai_sections(ai_analysis: Optional[Dict[str, Any]]) -> Tuple[List, Dict, List]:
+    """Prompt improvements, failure analysis and recommendations from an AI analysis."""
+    if not ai_analysis:
+        return [], {}, []
+    return (ai_analysis.get("prompt_improvements", []),
+            ai_analysis.get("failure_analysis", {}),
+            ai_analysis.get("recommendations", []))
+
 class SupervisorAgent:
     """
     Enhanced Supervisor Agent that processes full test traces, provides AI-powered analysis,
@@ -505,9 +1060,12 @@ class SupervisorAgent:
     """
     
     def __init__(self, enable_visual_traces: bool = True, 
-                 enable_ai_analysis: bool = True):
+                 enable_ai_analysis: bool = True,
+                 report_formats: Tuple[str, ...] = _REPORT_FORMATS):
         self.enable_visual_traces = enable_visual_traces
         self.enable_ai_analysis = enable_ai_analysis
+        # Report files to write; JSON-only consumers can skip the markdown/HTML writers
+        self.report_formats = frozenset(report_formats)
         self.logger = logging.getLogger("SupervisorAgent")
         
         # Initialize components
@@ -538,15 +1096,51 @@ class SupervisorAgent:
         self.logger.info(f"Started supervision session: {session_id}")
         return session_id
     
-    def record_agent_decision(self, agent_name: str, decision_data: Dict[str, Any]):
-        """Record agent decision for later analysis."""
+    def end_supervision_session(self):
+        """End the current session, closing any trace it left open and releasing the recorder's threads."""
+        if self.trace_recorder:
+            if self.trace_recorder.current_trace:
+                self.trace_recorder.end_trace()
+            self.trace_recorder.close()
+        
+        self.logger.info(f"Ended supervision session: {self.current_session_id}")
+        self.current_session_id = None
+    
+    def record_agent_decision(self, agent_name: str, decision_data: Dict[str, Any],
+                              kind: Optional[str] = None):
+        """
+        Record agent decision for later analysis.
+        
+        kind tags the event for the analysis predicates, e.g. "timeout",
+        "recovery", "blocking_modal", "false_positive" or an executor
+        failure type. Logs without one are matched by text instead.
+        """
+        self.agent_logs.append(self._make_log_entry(agent_name, decision_data, kind, time.time()))
+    
+    def record_agent_decisions_batch(self, decisions: List[Tuple[str, Dict[str, Any], Optional[str]]]):
+        """
+        Record several (agent_name, decision_data, kind) decisions at once.
+        
+        Entries share one timestamp, taken at the flush, unless decision_data
+        carries its own "timestamp".
+        """
+        now = time.time()
+        self.agent_logs.extend(self._make_log_entry(agent_name, decision_data, kind, now)
+                               for agent_name, decision_data, kind in decisions)
+    
+    def _make_log_entry(self, agent_name: str, decision_data: Dict[str, Any],
+                        kind: Optional[str], timestamp: float) -> Dict[str, Any]:
         log_entry = {
-            "timestamp": time.time(),
+            "timestamp": timestamp,
             "agent": agent_name,
             "session_id": self.current_session_id,
             **decision_data
         }
-        self.agent_logs.append(log_entry)
+        # Only an explicit kind is recorded; logs without one keep the text fallback
+        # in _build_log_index
+        if kind is not None:
+            log_entry["kind"] = kind
+        return log_entry
     
     def capture_environment_state(self, env_state: Dict[str, Any], 
                                  agent_action: Optional[Dict[str, Any]] = None,
@@ -578,16 +1172,19 @@ class SupervisorAgent:
         # End visual trace recording
         trace_data = None
         if self.trace_recorder:
-            trace_id = self.trace_recorder.end_trace()
-            trace_data = self.trace_recorder.current_trace
+            trace_id, trace_data = self.trace_recorder.end_trace()
+        
+        # The logs are indexed once for both the AI analysis and the metrics
+        log_index = _build_log_index(self.agent_logs)
         
         # Perform AI analysis
         ai_analysis = None
         if self.llm_processor and trace_data:
-            ai_analysis = self.llm_processor.analyze_test_trace(trace_data, self.agent_logs)
+            ai_analysis = self.llm_processor.analyze_test_trace(trace_data, self.agent_logs, log_index)
         
         # Generate evaluation report
-        overall_status = "PASS" if all(r.get("result") == "PASS" for r in final_results) else "FAIL"
+        status_rows = self._classify_results(final_results)
+        overall_status = "PASS" if all(passed for passed, _, _ in status_rows) else "FAIL"
         timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         
         evaluation_report = {
@@ -614,35 +1211,41 @@ class SupervisorAgent:
             "ai_analysis": ai_analysis,
             
             # Performance metrics
-            "metrics": self._calculate_performance_metrics(final_results, trace_data),
+            "metrics": self._calculate_performance_metrics(final_results, trace_data, log_index),
             
             # Summary statistics
-            "statistics": self._generate_statistics(final_results, trace_data, self.agent_logs)
+            "statistics": self._generate_statistics(final_results, trace_data, self.agent_logs,
+                                                    status_rows)
         }
         
         # Save comprehensive report
-        self._save_comprehensive_report(evaluation_report)
+        self._save_comprehensive_report(evaluation_report, status_rows)
         
         return evaluation_report
     
     def _calculate_performance_metrics(self, results: List[Dict], 
-                                     trace_data: Optional[Dict]) -> Dict[str, Any]:
+                                     trace_data: Optional[Dict],
+                                     log_index: Optional[_LogIndex] = None) -> Dict[str, Any]:
         """Calculate performance metrics."""
         
+        if log_index is None:
+            log_index = _build_log_index(self.agent_logs)
+        
         metrics = {
-            "bug_detection_accuracy": self._calculate_bug_detection_accuracy(results),
-            "agent_recovery_ability": self._calculate_recovery_ability(),
+            "bug_detection_accuracy": self._calculate_bug_detection_accuracy(results, log_index),
+            "agent_recovery_ability": self._calculate_recovery_ability(log_index),
             "test_efficiency": self._calculate_test_efficiency(trace_data),
             "coverage_completeness": self._calculate_coverage_completeness(results)
         }
         
         return metrics
     
-    def _calculate_bug_detection_accuracy(self, results: List[Dict]) -> Dict[str, Any]:
+    def _calculate_bug_detection_accuracy(self, results: List[Dict],
+                                          log_index: _LogIndex) -> Dict[str, Any]:
         """Calculate bug detection accuracy metrics."""
         
         # Count true positives, false positives, false negatives
-        verifier_logs = [log for log in self.agent_logs if log.get("agent") == "VerifierAgent"]
+        verifier_logs = log_index.by_agent.get("VerifierAgent", [])
         
         bugs_detected = 0
         false_positives = 0
@@ -676,16 +1279,14 @@ class SupervisorAgent:
             "f1_score": f1_score
         }
     
-    def _calculate_recovery_ability(self) -> Dict[str, Any]:
+    def _calculate_recovery_ability(self, log_index: _LogIndex) -> Dict[str, Any]:
         """Calculate agent recovery ability metrics."""
         
         # Find replanning events
-        replanning_logs = [log for log in self.agent_logs 
-                          if "replanning" in log.get("action", "")]
+        replanning_logs = log_index.replanning
         
         # Find error recovery events
-        recovery_logs = [log for log in self.agent_logs 
-                        if "recovery" in str(log) or "retry" in str(log)]
+        recovery_logs = log_index.recovery
         
         # Calculate success rate of recovery attempts
         successful_recoveries = [log for log in recovery_logs 
@@ -733,220 +1334,235 @@ class SupervisorAgent:
         tested_features = set()
         for result in results:
             step_description = result.get("step", "")
-            if "wifi" in step_description.lower():
-                tested_features.add("wifi_functionality")
-            if "toggle" in step_description.lower():
-                tested_features.add("toggle_operations")
-            if "navigation" in step_description.lower():
-                tested_features.add("app_navigation")
-        
-        # Expected features for comprehensive testing
-        expected_features = {
-            "wifi_functionality", "toggle_operations", "app_navigation",
-            "error_handling", "state_persistence", "ui_responsiveness"
-        }
+            for match in _FEATURE_KEYWORD_RE.finditer(step_description):
+                tested_features.add(_FEATURE_KEYWORDS[match.group().lower()])
         
-        coverage_percentage = (len(tested_features) / len(expected_features)) * 100
+        coverage_percentage = (len(tested_features) / len(_EXPECTED_FEATURES)) * 100
         
         return {
             "tested_features": list(tested_features),
-            "expected_features": list(expected_features),
+            "expected_features": list(_EXPECTED_FEATURES),
             "coverage_percentage": coverage_percentage,
-            "missing_features": list(expected_features - tested_features)
+            "missing_features": list(_EXPECTED_FEATURES - tested_features)
         }
     
+    @staticmethod
+    def _classify_results(results: List[Dict]) -> List[Tuple[bool, Any, Any]]:
+        """Read each result once into (passed, status, step) rows for the report writers."""
+        return [(status == "PASS", status, r.get("step"))
+                for status, r in zip(_result_statuses(results), results)]
+    
     def _generate_statistics(self, results: List[Dict], 
                            trace_data: Optional[Dict],
-                           agent_logs: List[Dict]) -> Dict[str, Any]:
+                           agent_logs: List[Dict],
+                           status_rows: Optional[List[Tuple[bool, Any, Any]]] = None) -> Dict[str, Any]:
         """Generate summary statistics."""
         
+        if status_rows is None:
+            status_rows = self._classify_results(results)
+        
+        # Statuses other than PASS/FAIL count as neither
+        passed = 0
+        failed = 0
+        for is_pass, status, _ in status_rows:
+            if is_pass:
+                passed += 1
+            elif status == "FAIL":
+                failed += 1
+        
         return {
             "total_test_steps": len(results),
-            "passed_steps": len([r for r in results if r.get("result") == "PASS"]),
-            "failed_steps": len([r for r in results if r.get("result") == "FAIL"]),
+            "passed_steps": passed,
+            "failed_steps": failed,
             "total_agent_decisions": len(agent_logs),
-            "unique_agents": len(set(log.get("agent") for log in agent_logs)),
+            "unique_agents": len({log.get("agent") for log in agent_logs}),
             "visual_frames_captured": len(trace_data.get("frames", [])) if trace_data else 0,
-            "test_success_rate": (len([r for r in results if r.get("result") == "PASS"]) / 
-                                max(len(results), 1)) * 100
+            "test_success_rate": (passed / max(len(results), 1)) * 100
         }
     
-    def _save_comprehensive_report(self, evaluation_report: Dict[str, Any]):
-        """Save comprehensive evaluation report in multiple formats."""
+    def _save_comprehensive_report(self, evaluation_report: Dict[str, Any],
+                                   status_rows: Optional[List[Tuple[bool, Any, Any]]] = None,
+                                   *, formats: Optional[Tuple[str, ...]] = None):
+        """Save comprehensive evaluation report in the requested formats (default: self.report_formats)."""
         
+        formats = self.report_formats if formats is None else frozenset(formats)
         timestamp = evaluation_report["timestamp"]
+        write_json = "json" in formats
+        write_md = "md" in formats
+        write_html = "html" in formats and evaluation_report["visual_trace"]["enabled"]
+        ai_analysis = evaluation_report.get("ai_analysis")
+        if status_rows is None:
+            status_rows = self._classify_results(evaluation_report["test_results"])
+        # Read the AI sections once for both the markdown summary and the console insights
+        ai_sections = _extract_ai_sections(ai_analysis)
         
         # Ensure reports directory exists
-        os.makedirs("reports", exist_ok=True)
+        _ensure_reports_dir()
         
-        # Save detailed JSON report
-        json_path = f"reports/supervisor_evaluation_{timestamp}.json"
-        with open(json_path, 'w') as f:
-            json.dump(evaluation_report, f, indent=2, default=str)
+        # Save detailed JSON report; it is machine-read, so compact unless
+        # QA_PRETTY_JSON asks for an indented copy to inspect by hand
+        if write_json:
+            json_path = f"reports/supervisor_evaluation_{timestamp}.json"
+            _dump_json(evaluation_report, json_path, pretty=bool(os.environ.get("QA_PRETTY_JSON")))
         
         # Generate executive summary markdown
-        md_path = f"reports/supervisor_summary_{timestamp}.md"
-        self._generate_executive_summary_markdown(evaluation_report, md_path)
+        if write_md:
+            md_path = f"reports/supervisor_summary_{timestamp}.md"
+            self._generate_executive_summary_markdown(evaluation_report, md_path, status_rows,
+                                                      ai_sections=ai_sections)
         
         # Generate HTML report if trace data exists
-        if evaluation_report["visual_trace"]["enabled"]:
+        if write_html:
             html_path = f"reports/visual_report_{timestamp}.html"
-            self._generate_visual_html_report(evaluation_report, html_path)
+            self._generate_visual_html_report(evaluation_report, html_path, status_rows)
         
         print(f"\n[Supervisor Agent] Comprehensive evaluation completed:")
-        print(f"- Detailed JSON: {json_path}")
-        print(f"- Executive Summary: {md_path}")
-        if evaluation_report["visual_trace"]["enabled"]:
+        if write_json:
+            print(f"- Detailed JSON: {json_path}")
+        if write_md:
+            print(f"- Executive Summary: {md_path}")
+        if write_html:
             print(f"- Visual Report: {html_path}")
         print(f"Overall Result: {evaluation_report['overall_status']}")
         
         # Print key insights
-        if evaluation_report.get("ai_analysis"):
-            self._print_key_insights(evaluation_report["ai_analysis"])
+        if ai_analysis:
+            self._print_key_insights(ai_analysis, ai_sections=ai_sections)
     
     def _generate_executive_summary_markdown(self, report: Dict[str, Any], 
-                                           output_path: str):
+                                           output_path: str,
+                                           status_rows: Optional[List[Tuple[bool, Any, Any]]] = None,
+                                           ai_sections: Optional[Tuple[List, Dict, List]] = None):
         """Generate executive summary in markdown format."""
         
-        ai_analysis = report.get("ai_analysis", {})
-        metrics = report.get("metrics", {})
-        
-        md_content = f"""# QA Test Evaluation Report
+        if status_rows is None:
+            status_rows = self._classify_results(report['test_results'])
+        if ai_sections is None:
+            ai_sections = _extract_ai_sections(report.get("ai_analysis"))
+        improvements, failure_analysis, recommendations = ai_sections
         
-## Executive Summary
-**Test Goal:** {report['test_goal']}  
-**Overall Result:** {report['overall_status']}  
-**Test Date:** {report['timestamp']}  
-**Session ID:** {report['session_id']}
-
-## Key Metrics
-- **Bug Detection Accuracy:** {metrics.get('bug_detection_accuracy', {}).get('f1_score', 0):.2f} F1-Score
-- **Agent Recovery Ability:** {metrics.get('agent_recovery_ability', {}).get('recovery_success_rate', 0):.2f} Success Rate
-- **Test Efficiency:** {metrics.get('test_efficiency', {}).get('efficiency_score', 0):.2f}/1.0
-- **Coverage Completeness:** {metrics.get('coverage_completeness', {}).get('coverage_percentage', 0):.1f}%
-
-## Visual Trace Summary
-- **Frames Captured:** {report['visual_trace']['frame_count']}
-- **Trace Duration:** {report['visual_trace']['trace_duration']:.1f} seconds
-- **Trace ID:** {report['visual_trace']['trace_id']}
-
-## AI Analysis Insights
-"""
+        metrics = report.get("metrics", {})
+        visual_trace = report['visual_trace']
+        test_goal, overall_status, timestamp, session_id = _REPORT_HEADER(report)
+        
+        lines = [
+            "# QA Test Evaluation Report",
+            "",
+            "## Executive Summary",
+            f"**Test Goal:** {test_goal}  ",
+            f"**Overall Result:** {overall_status}  ",
+            f"**Test Date:** {timestamp}  ",
+            f"**Session ID:** {session_id}",
+            "",
+            "## Key Metrics",
+            f"- **Bug Detection Accuracy:** {metrics.get('bug_detection_accuracy', {}).get('f1_score', 0):.2f} F1-Score",
+            f"- **Agent Recovery Ability:** {metrics.get('agent_recovery_ability', {}).get('recovery_success_rate', 0):.2f} Success Rate",
+            f"- **Test Efficiency:** {metrics.get('test_efficiency', {}).get('efficiency_score', 0):.2f}/1.0",
+            f"- **Coverage Completeness:** {metrics.get('coverage_completeness', {}).get('coverage_percentage', 0):.1f}%",
+            "",
+            "## Visual Trace Summary",
+            f"- **Frames Captured:** {visual_trace['frame_count']}",
+            f"- **Trace Duration:** {visual_trace['trace_duration']:.1f} seconds",
+            f"- **Trace ID:** {visual_trace['trace_id']}",
+            "",
+            "## AI Analysis Insights"
+        ]
+        # Each section goes in with one extend so the list grows once per section
+        extend = lines.extend
+        
+        # Add prompt improvements
+        if improvements:
+            extend(["", "### Prompt Improvement Suggestions",
+                    *(f"- **{imp['agent']}:** {imp['suggestion']} ({imp['impact']} impact)"
+                      for imp in improvements)])
         
-        if ai_analysis:
-            # Add prompt improvements
-            improvements = ai_analysis.get("prompt_improvements", [])
-            if improvements:
-                md_content += "\n### Prompt Improvement Suggestions\n"
-                for imp in improvements:
-                    md_content += f"- **{imp['agent']}:** {imp['suggestion']} ({imp['impact']} impact)\n"
-            
-            # Add failure analysis
-            failure_analysis = ai_analysis.get("failure_analysis", {})
-            if failure_analysis:
-                md_content += f"\n### Failure Analysis\n"
-                md_content += f"- **Total Failures:** {failure_analysis.get('total_failures', 0)}\n"
-                md_content += f"- **Failure Rate:** {failure_analysis.get('failure_rate', 0):.2%}\n"
-            
-            # Add recommendations
-            recommendations = ai_analysis.get("recommendations", [])
-            if recommendations:
-                md_content += "\n### Recommendations\n"
-                for rec in recommendations:
-                    md_content += f"- **{rec['title']}** ({rec['priority']} priority): {rec['description']}\n"
+        # Add failure analysis
+        if failure_analysis:
+            extend([
+                "",
+                "### Failure Analysis",
+                f"- **Total Failures:** {failure_analysis.get('total_failures', 0)}",
+                f"- **Failure Rate:** {failure_analysis.get('failure_rate', 0):.2%}"
+            ])
+        
+        # Add recommendations
+        if recommendations:
+            extend(["", "### Recommendations",
+                    *(f"- **{rec['title']}** ({rec['priority']} priority): {rec['description']}"
+                      for rec in recommendations)])
         
         # Add test step results
-        md_content += "\n## Test Step Results\n"
-        for i, result in enumerate(report['test_results'], 1):
-            status_emoji = "✅" if result.get("result") == "PASS" else "❌"
-            md_content += f"{i}. {status_emoji} {result.get('step', 'Unknown step')}\n"
+        extend(["", "## Test Step Results",
+                *(f"{i}. {_MD_STATUS[is_pass]} {step if step is not None else 'Unknown step'}"
+                  for i, (is_pass, _, step) in enumerate(status_rows, 1)),
+                ""])
         
         with open(output_path, 'w') as f:
-            f.write(md_content)
+            f.write("\n".join(lines))
     
     def _generate_visual_html_report(self, report: Dict[str, Any], 
-                                   output_path: str):
+                                   output_path: str,
+                                   status_rows: Optional[List[Tuple[bool, Any, Any]]] = None):
         """Generate visual HTML report with embedded screenshots."""
         
-        # This is a simplified version - in practice, you'd embed actual screenshots
-        html_content = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <title>QA Visual Test Report</title>
-    <style>
-        body {{ font-family: Arial, sans-serif; margin: 20px; }}
-        .header {{ background: #f0f0f0; padding: 20px; border-radius: 5px; }}
-        .metric {{ display: inline-block; margin: 10px; padding: 10px; background: #e8f4fd; border-radius: 3px; }}
-        .frame {{ margin: 10px 0; padding: 10px; border: 1px solid #ddd; }}
-        .status-pass {{ color: green; font-weight: bold; }}
-        .status-fail {{ color: red; font-weight: bold; }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>QA Visual Test Report</h1>
-        <p><strong>Test Goal:</strong> {report['test_goal']}</p>
-        <p><strong>Overall Result:</strong> 
-           <span class="status-{report['overall_status'].lower()}">{report['overall_status']}</span></p>
-        <p><strong>Session ID:</strong> {report['session_id']}</p>
-    </div>
-    
-    <h2>Performance Metrics</h2>
-    <div class="metrics">
-"""
-        
-        metrics = report.get("metrics", {})
-        for metric_name, metric_data in metrics.items():
-            if isinstance(metric_data, dict):
-                score = metric_data.get("f1_score") or metric_data.get("efficiency_score") or metric_data.get("coverage_percentage", 0)
-                html_content += f'<div class="metric">{metric_name.replace("_", " ").title()}: {score:.2f}</div>'
+        if status_rows is None:
+            status_rows = self._classify_results(report['test_results'])
         
-        html_content += """
-    </div>
-    
-    <h2>Visual Trace</h2>
-    <p>Screenshots and UI states captured during test execution would be displayed here.</p>
+        # Stream straight into the buffered file rather than building one big string
+        with open(output_path, 'w', buffering=1 << 16) as f:
+            w = f.write
+            
+            # This is a simplified version - in practice, you'd embed actual screenshots.
+            # Every report value is escaped before it reaches the markup.
+            esc = html.escape
+            overall_status = str(report['overall_status'])
+            w(_HTML_HEADER.substitute(
+                goal=esc(str(report['test_goal'])),
+                status=esc(overall_status),
+                status_lc=esc(overall_status.lower()),
+                session=esc(str(report['session_id']))
+            ))
+            
+            metrics = report.get("metrics", {})
+            for metric_name, metric_data in metrics.items():
+                if isinstance(metric_data, dict):
+                    score = metric_data.get("f1_score") or metric_data.get("efficiency_score") or metric_data.get("coverage_percentage", 0)
+                    w(f'<div class="metric">{esc(metric_name.replace("_", " ").title())}: {score:.2f}</div>')
+            
+            w(_HTML_STEPS_HEADER)
+            
+            # Step rows are built from the pre-read (passed, status, step) tuples and written at once
+            w("".join(f'<div class="frame">{i}. <span class="{_HTML_CLASS[is_pass]}">{esc(str(status))}</span> - {esc(str(step)) if step is not None else "Unknown"}</div>'
+                      for i, (is_pass, status, step) in enumerate(status_rows, 1)))
+            
+            w(_HTML_FOOTER)
     
-    <h2>Test Steps</h2>
-"""
-        
-        for i, result in enumerate(report['test_results'], 1):
-            status_class = "status-pass" if result.get("result") == "PASS" else "status-fail"
-            html_content += f'<div class="frame">{i}. <span class="{status_class}">{result.get("result")}</span> - {result.get("step", "Unknown")}</div>'
+    def _print_key_insights(self, ai_analysis: Dict[str, Any],
+                            ai_sections: Optional[Tuple[List, Dict, List]] = None):
+        """Log key insights from AI analysis."""
         
-        html_content += """
-</body>
-</html>
-"""
-        
-        with open(output_path, 'w') as f:
-            f.write(html_content)
-    
-    def _print_key_insights(self, ai_analysis: Dict[str, Any]):
-        """Print key insights from AI analysis."""
+        if ai_sections is None:
+            ai_sections = _extract_ai_sections(ai_analysis)
+        improvements, failure_analysis, recommendations = ai_sections
         
-        print("\n🔍 AI Analysis Key Insights:")
+        logger.info("\n🔍 AI Analysis Key Insights:")
         
-        # Print prompt improvements
-        improvements = ai_analysis.get("prompt_improvements", [])
+        # Log prompt improvements
         if improvements:
-            print(f"📝 {len(improvements)} prompt improvements suggested")
+            logger.info("📝 %d prompt improvements suggested", len(improvements))
             for imp in improvements[:2]:  # Show top 2
-                print(f"   • {imp['agent']}: {imp['suggestion']}")
+                logger.info("   • %s: %s", imp['agent'], imp['suggestion'])
         
-        # Print failure analysis
-        failure_analysis = ai_analysis.get("failure_analysis", {})
+        # Log failure analysis
         if failure_analysis:
             total_failures = failure_analysis.get("total_failures", 0)
             if total_failures > 0:
-                print(f"⚠️  {total_failures} failures detected and analyzed")
+                logger.info("⚠️  %d failures detected and analyzed", total_failures)
         
-        # Print top recommendation
-        recommendations = ai_analysis.get("recommendations", [])
+        # Log top recommendation
         if recommendations:
             top_rec = recommendations[0]
-            print(f"💡 Top recommendation: {top_rec['title']} ({top_rec['priority']} priority)")
+            logger.info("💡 Top recommendation: %s (%s priority)", top_rec['title'], top_rec['priority'])
 
 # Legacy function for backward compatibility
 def summarize_results(test_goal, results):
@@ -954,11 +1570,13 @@ def summarize_results(test_goal, results):
     supervisor = SupervisorAgent(enable_visual_traces=False, enable_ai_analysis=False)
     
     # Calculate overall status
-    overall_status = "PASS" if all(r.get("result") == "PASS" for r in results) else "FAIL"
+    # Stop at the first non-passing step rather than reducing over every result
+    first_failure = next((r for r in results if r.get("result") != "PASS"), None)
+    overall_status = "PASS" if first_failure is None else "FAIL"
     timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 
     # Ensure reports folder exists
-    os.makedirs("reports", exist_ok=True)
+    _ensure_reports_dir()
 
     # JSON report
     json_report = {
@@ -968,8 +1586,9 @@ def summarize_results(test_goal, results):
         "timestamp": timestamp
     }
     json_path = f"reports/qa_report_{timestamp}.json"
+    payload = json.dumps(json_report, indent=4)
     with open(json_path, "w") as f:
-        json.dump(json_report, f, indent=4)
+        f.write(payload)
 
     # Markdown report
     md_lines = [f"# QA Test Report", f"**Test Goal:** {test_goal}", f"**Overall Result:** {overall_status}", "", "## Step Results:"]
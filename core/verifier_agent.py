@@ -24,10 +24,13 @@ class VerifierAgent:
         self.task_name = task_name
         self.enable_logging = enable_logging
         self.logger = logging.getLogger(f"VerifierAgent.{task_name}")
+        self.bug_detection_rules = self._initialize_bug_detection_rules()
+        self.reset()
         
+    def reset(self):
+        """Clear verification history and metrics so the agent can be reused for a new test."""
         # Verification state
         self.verification_history = []
-        self.bug_detection_rules = self._initialize_bug_detection_rules()
         self.ui_state_expectations = {}
         self.current_verification_session = None
         
@@ -581,7 +581,7 @@ Our QA automation framework demonstrates strong performance across the Android-i
 - **High Accuracy**: {summary.get('average_accuracy', 0):.1%} success rate across diverse Android applications
 - **Robust Performance**: {summary.get('average_robustness', 0):.1%} reliability under various UI challenges
 - **Strong Generalization**: {summary.get('average_generalization', 0):.1%} adaptability to new scenarios
-- **Comprehensive Coverage**: Evaluation across {len(set(s['app_name'] for s in self.aitw_scenarios))} different Android applications
+- **Comprehensive Coverage**: Evaluation across {len({s['app_name'] for s in self.aitw_scenarios})} different Android applications
 
 ### Areas for Improvement
 """
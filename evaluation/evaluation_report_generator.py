@@ -11,6 +11,13 @@ from datetime import datetime
 from typing import Dict, List, Any, Optional
 import statistics
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
 class EvaluationReportGenerator:
     """
     Generates comprehensive evaluation reports analyzing:
@@ -498,8 +505,21 @@ class EvaluationReportGenerator:
         
         # Save detailed JSON
         json_path = os.path.join(self.reports_dir, f"comprehensive_evaluation_{timestamp_str}.json")
-        with open(json_path, 'w') as f:
-            json.dump(evaluation_report, f, indent=2, default=str)
+        payload = None
+        if ORJSON_AVAILABLE:
+            try:
+                payload = orjson.dumps(evaluation_report, default=str,
+                                       option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS |
+                                       orjson.OPT_PASSTHROUGH_DATETIME)
+            except TypeError:
+                # Fall back to the stdlib encoder for anything orjson rejects
+                payload = None
+        if payload is not None:
+            with open(json_path, 'wb') as f:
+                f.write(payload)
+        else:
+            with open(json_path, 'w', buffering=1 << 18) as f:
+                json.dump(evaluation_report, f, indent=2, default=str)
         
         # Generate summary markdown
         md_path = os.path.join(self.reports_dir, f"evaluation_summary_{timestamp_str}.md")
@@ -4,34 +4,108 @@ Fully Automated WiFi Testing QA Flow
 Toggles WiFi on/off, captures screenshots, and generates comprehensive reports
 """
 
+import argparse
+import asyncio
+import logging
 import subprocess
 import time
 import json
 import os
-from datetime import datetime
+import shlex
+import sys
+from datetime import datetime, timedelta
 from pathlib import Path
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
 # Import our QA agents
 from planner_agent import PlannerAgent
 from executor_agent import ExecutorAgent
 from verifier_agent import VerifierAgent
 from supervisor_agent import SupervisorAgent
 
+# Progress output is gated by level: WARNING by default, INFO with --verbose
+logger = logging.getLogger("qa")
+
+# Printed after every command fed to the persistent shell, followed by its exit code
+_SHELL_SENTINEL = "__END__"
+# Longest a persistent-shell command may take before the shell is abandoned (seconds)
+_SHELL_TIMEOUT = 10
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Markdown report templates, parsed once; bound methods so each use is a single call
+_SCENARIO_MD = """
+#### {i}. {name} {status}
+- **Goal**: {goal}
+- **Duration**: {duration} seconds
+- **Timestamp**: {timestamp}
+""".format
+_SCREENSHOT_MD = "- **{scenario}**: `{filename}` ({timestamp})\n".format_map
+_DETAILS_MD = """
+### 📈 Performance Metrics
+- **Average Scenario Duration**: {metrics[average_scenario_duration]} seconds
+- **Total Test Duration**: {metrics[total_test_duration]} seconds
+- **Success Rate**: {metrics[success_rate]:.1f}%
+
+### 🔧 Technical Details
+- **ADB Path**: {adb_path}
+- **Device ID**: {device_id}
+- **Final WiFi Status**: {summary[final_wifi_status]}
+- **Test Status**: {summary[test_status]}
+
+### 🚀 QA Agents Performance
+All four QA agents (Planner, Executor, Verifier, Supervisor) worked together to:
+1. **Plan** each test scenario automatically
+2. **Execute** WiFi operations and UI interactions
+3. **Verify** results and validate state changes
+4. **Supervise** overall test quality and performance
+
+---
+*Report generated by Automated WiFi Testing QA Flow*
+""".format
+
+def _is_png(path):
+    """True if path starts with the PNG signature."""
+    with open(path, "rb") as f:
+        return f.read(len(_PNG_SIGNATURE)) == _PNG_SIGNATURE
+
 class AutomatedWiFiTester:
     def __init__(self):
         self.device_id = "emulator-5554"
         self.adb_path = "/Users/rishikagour/Library/Android/sdk/platform-tools/adb"
-        self.test_results = {
-            "test_session": {
-                "start_time": datetime.now().isoformat(),
-                "test_type": "Automated WiFi Toggle Testing",
-                "device": "Pixel 6 Emulator (Android 13)"
-            },
-            "scenarios": [],
-            "screenshots": [],
-            "performance_metrics": {},
-            "summary": {}
+        # One long-lived `adb shell` serves every shell command instead of a new adb per call;
+        # it is started on first use inside the event loop
+        self.shell = None
+        self._shell_started = False
+        self._shell_lock = None
+        # Last WiFi status read from the device and when it was read (time.monotonic())
+        self._wifi_status_cache = (None, 0.0)
+        # Number of scenarios in the last completed suite run
+        self._scenario_count = 0
+        # Test plans by goal; the planner is deterministic per goal and plans are not mutated
+        self._plan_cache = {}
+        # Wall-clock anchor; later timestamps are this plus a monotonic offset
+        self._t0_dt = datetime.now()
+        self._t0_m = time.monotonic()
+        # Screenshots are written relative to the working directory the suite starts in
+        self._cwd = os.getcwd()
+        # Results accumulate in flat lists during the run; _fold_results() builds the
+        # nested test_results shape from them once, for the caller and the reports
+        self._session = {
+            "start_time": self._t0_dt.isoformat(),
+            "test_type": "Automated WiFi Toggle Testing",
+            "device": "Pixel 6 Emulator (Android 13)"
         }
+        self._scenarios = []
+        self._screenshots = []
+        self._metrics = {}
+        self._summary = {}
+        self.test_results = self._fold_results()
         
         # Initialize QA agents with proper task configuration
         try:
@@ -39,86 +113,258 @@ class AutomatedWiFiTester:
             self.executor = ExecutorAgent(task_name="settings_wifi")
             self.verifier = VerifierAgent(task_name="settings_wifi")
             self.supervisor = SupervisorAgent(task_name="settings_wifi")
-            print("✅ All QA agents initialized successfully")
+            logger.info("✅ All QA agents initialized successfully")
         except Exception as e:
-            print(f"⚠️ Agent initialization warning: {e}")
-            print("🔄 Will use fallback mode for QA operations")
+            logger.warning("⚠️ Agent initialization warning: %s", e)
+            logger.warning("🔄 Will use fallback mode for QA operations")
         
-        print("🚀 Automated WiFi Testing QA Flow Initialized")
-        print(f"📱 Target Device: {self.device_id}")
-        print(f"🔧 ADB Path: {self.adb_path}")
+        logger.info("🚀 Automated WiFi Testing QA Flow Initialized")
+        logger.info("📱 Target Device: %s", self.device_id)
+        logger.info("🔧 ADB Path: %s", self.adb_path)
+
+    def now(self):
+        """Current local time, derived from the monotonic clock since __init__"""
+        return self._t0_dt + timedelta(seconds=time.monotonic() - self._t0_m)
+
+    def now_iso(self):
+        """Current local time as an ISO 8601 string"""
+        return self.now().isoformat()
+
+    async def _start_shell(self):
+        """Start the persistent `adb shell` process, or return None if adb can't be launched."""
+        try:
+            return await asyncio.create_subprocess_exec(
+                self.adb_path, "-s", self.device_id, "shell",
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+            )
+        except OSError as e:
+            logger.warning("⚠️ Persistent ADB shell unavailable, using one-off commands: %s", e)
+            return None
+
+    async def _run_in_shell(self, command):
+        """Run a device shell command through the persistent shell; None if the shell is gone."""
+        try:
+            # The sentinel goes on its own line so output without a trailing newline still parses
+            self.shell.stdin.write(f"{command}; printf '\\n{_SHELL_SENTINEL}%d\\n' $?\n".encode())
+            await self.shell.stdin.drain()
+            # A command that never finishes would hold the shell lock and stall every queued call
+            return await asyncio.wait_for(self._read_until_sentinel(), timeout=_SHELL_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning("⚠️ ADB shell command timed out, falling back to one-off commands: %s", command)
+            try:
+                self.shell.kill()
+            except ProcessLookupError:
+                pass
+            self.shell = None
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("⚠️ Persistent ADB shell lost, falling back to one-off commands: %s", e)
+            self.shell = None
+            return None
 
-    def run_adb_command(self, command):
+    async def _read_until_sentinel(self):
+        """Collect shell output up to the sentinel line; return (output, success)"""
+        lines = []
+        while True:
+            line = (await self.shell.stdout.readline()).decode(errors="replace")
+            if not line:
+                raise OSError("adb shell exited")
+            if line.startswith(_SHELL_SENTINEL):
+                return "".join(lines).strip(), line[len(_SHELL_SENTINEL):].strip() == "0"
+            lines.append(line)
+
+    async def close(self):
+        """Shut down the persistent adb shell."""
+        if self.shell is None:
+            return
+        try:
+            self.shell.stdin.close()
+            await asyncio.wait_for(self.shell.wait(), timeout=5)
+        except (OSError, asyncio.TimeoutError):
+            self.shell.kill()
+        self.shell = None
+
+    async def _shell_command(self, command):
+        """Run a device shell command on the persistent shell; None if it is unavailable"""
+        if self._shell_lock is None:
+            self._shell_lock = asyncio.Lock()
+        # The shell runs one command at a time, so concurrent callers queue here
+        async with self._shell_lock:
+            if not self._shell_started:
+                self._shell_started = True
+                self.shell = await self._start_shell()
+            if self.shell is not None:
+                return await self._run_in_shell(command)
+        return None
+
+    async def run_adb_command(self, command):
         """Execute ADB command and return output"""
-        full_command = f'export PATH="/Users/rishikagour/Library/Android/sdk/platform-tools:$PATH" && {self.adb_path} -s {self.device_id} {command}'
+        # Device shell commands reuse the persistent shell; others (pull, etc.) run one-off
+        if command.startswith("shell "):
+            result = await self._shell_command(command[len("shell "):])
+            if result is not None:
+                return result
+        
+        # adb is called by full path with an argv list, so no local /bin/sh is spawned;
+        # `adb shell` joins the words back up for the device-side shell
         try:
-            result = subprocess.run(full_command, shell=True, capture_output=True, text=True)
-            return result.stdout.strip(), result.returncode == 0
+            proc = await asyncio.create_subprocess_exec(
+                self.adb_path, "-s", self.device_id, *shlex.split(command),
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+            stdout, _ = await proc.communicate()
+            return stdout.decode(errors="replace").strip(), proc.returncode == 0
         except Exception as e:
-            print(f"❌ ADB command failed: {e}")
+            logger.error("❌ ADB command failed: %s", e)
             return str(e), False
 
-    def capture_screenshot(self, scenario_name):
+    async def run_adb_fire_and_forget(self, command):
+        """Execute ADB command whose output is not needed; return only whether it succeeded"""
+        if command.startswith("shell "):
+            # Output is dropped on the device, so nothing comes back to decode
+            result = await self._shell_command(f"{{ {command[len('shell '):]}; }} >/dev/null 2>&1")
+            if result is not None:
+                return result[1]
+        
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                self.adb_path, "-s", self.device_id, *shlex.split(command),
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            return await proc.wait() == 0
+        except Exception as e:
+            logger.error("❌ ADB command failed: %s", e)
+            return False
+
+    async def run_adb_to_file(self, command, out_path):
+        """Execute ADB command with its stdout written straight to out_path; return (stderr, success)"""
+        # The file is the child's stdout, so the bytes never pass through Python
+        try:
+            with open(out_path, "wb") as f:
+                proc = await asyncio.create_subprocess_exec(
+                    self.adb_path, "-s", self.device_id, *shlex.split(command),
+                    stdout=f, stderr=subprocess.PIPE
+                )
+                _, stderr = await proc.communicate()
+            return stderr.decode(errors="replace").strip(), proc.returncode == 0
+        except OSError as e:
+            return str(e), False
+
+    async def run_adb_batch(self, commands, discard_output=False):
+        """Run several device shell commands in one ADB round trip"""
+        command = "shell " + "; ".join(commands)
+        if discard_output:
+            return await self.run_adb_fire_and_forget(command)
+        return await self.run_adb_command(command)
+
+    async def capture_screenshot(self, scenario_name):
         """Capture screenshot and save with timestamp"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = self.now().strftime("%Y%m%d_%H%M%S")
         filename = f"wifi_test_{scenario_name}_{timestamp}.png"
         
-        # Capture screenshot on device
-        self.run_adb_command(f'shell screencap -p /sdcard/{filename}')
+        # Stream the PNG straight into the local file: no /sdcard copy and no pull
+        output, success = await self.run_adb_to_file("exec-out screencap -p", filename)
+        # exec-out doesn't always report device-side failures, so check what arrived
+        success = success and _is_png(filename)
         
-        # Pull screenshot to local machine
-        output, success = self.run_adb_command(f'pull /sdcard/{filename} {filename}')
+        if not success:
+            # Don't leave an empty or partial PNG behind
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
         
         if success:
-            self.test_results["screenshots"].append({
+            self._screenshots.append({
                 "scenario": scenario_name,
                 "filename": filename,
                 "timestamp": timestamp,
-                "path": os.path.abspath(filename)
+                "path": os.path.join(self._cwd, filename)
             })
-            print(f"📸 Screenshot captured: {filename}")
+            logger.info("📸 Screenshot captured: %s", filename)
             return filename
         else:
-            print(f"❌ Screenshot capture failed: {output}")
+            logger.error("❌ Screenshot capture failed: %s", output)
             return None
 
-    def get_wifi_status(self):
-        """Get current WiFi status"""
-        output, success = self.run_adb_command('shell dumpsys wifi | grep "Wi-Fi is"')
+    async def get_wifi_status(self, max_age=0.5):
+        """Get current WiFi status, reusing a reading taken within the last max_age seconds"""
+        status, read_at = self._wifi_status_cache
+        if status is not None and time.monotonic() - read_at < max_age:
+            return status
+        
+        output, success = await self.run_adb_command('shell dumpsys wifi | grep "Wi-Fi is"')
         if success and output:
-            return "enabled" if "enabled" in output.lower() else "disabled"
-        return "unknown"
+            status = "enabled" if "enabled" in output.lower() else "disabled"
+        else:
+            status = "unknown"
+        self._wifi_status_cache = (status, time.monotonic())
+        return status
 
-    def toggle_wifi(self, enable=True):
+    def _invalidate_wifi_status(self):
+        """Forget the cached WiFi status after an action that may change it"""
+        self._wifi_status_cache = (None, 0.0)
+
+    async def wait_for_wifi(self, target, timeout=2.0, interval=0.1):
+        """Poll the WiFi status until it reads target or timeout elapses; return the last status"""
+        deadline = time.monotonic() + timeout
+        status = await self.get_wifi_status(max_age=0)
+        while status != target and time.monotonic() < deadline:
+            await asyncio.sleep(interval)
+            status = await self.get_wifi_status(max_age=0)
+        return status
+
+    async def wait_for_airplane_mode(self, enabled, timeout=2.0, interval=0.1):
+        """Poll airplane_mode_on until it matches enabled or timeout elapses"""
+        target = "1" if enabled else "0"
+        deadline = time.monotonic() + timeout
+        output, _ = await self.run_adb_command('shell settings get global airplane_mode_on')
+        while output != target and time.monotonic() < deadline:
+            await asyncio.sleep(interval)
+            output, _ = await self.run_adb_command('shell settings get global airplane_mode_on')
+        return output == target
+
+    async def toggle_wifi(self, enable=True):
         """Toggle WiFi on or off"""
         action = "enable" if enable else "disable"
-        output, success = self.run_adb_command(f'shell svc wifi {action}')
-        time.sleep(2)  # Wait for state change
+        self._invalidate_wifi_status()
+        success = await self.run_adb_fire_and_forget(f'shell svc wifi {action}')
+        # Wait for the state change rather than sleeping a fixed interval; the final
+        # reading stays cached for the status check that usually follows
+        await self.wait_for_wifi("enabled" if enable else "disabled")
         return success
 
-    def run_qa_flow_scenario(self, scenario_name, goal):
-        """Run QA flow for a specific scenario"""
-        print(f"\n🎯 Running QA Flow: {scenario_name}")
-        print(f"📋 Goal: {goal}")
+    async def run_qa_flow_scenario(self, scenario_name, goal, wifi_status=None):
+        """Run QA flow for a specific scenario; wifi_status is the state observed for it, if known"""
+        logger.info("\n🎯 Running QA Flow: %s", scenario_name)
+        logger.info("📋 Goal: %s", goal)
         
         start_time = time.time()
         
         try:
+            # Agent calls are blocking, so they run on a worker thread while ADB work proceeds
             # Step 1: Planner creates test plan
-            print("📝 Planner: Creating test plan...")
-            plan = self.planner.generate_test_plan(goal)
+            plan = self._plan_cache.get(goal)
+            if plan is None:
+                logger.info("📝 Planner: Creating test plan...")
+                plan = await asyncio.to_thread(self.planner.generate_test_plan, goal)
+                self._plan_cache[goal] = plan
+            else:
+                logger.info("📝 Planner: Reusing cached test plan...")
             
             # Step 2: Executor executes the plan
-            print("⚡ Executor: Executing test plan...")
-            execution_result = self.executor.execute_plan(plan)
+            logger.info("⚡ Executor: Executing test plan...")
+            execution_result = await asyncio.to_thread(self.executor.execute_plan, plan)
             
             # Step 3: Verifier validates results
-            print("✅ Verifier: Validating results...")
-            verification_result = self.verifier.verify_execution(execution_result)
+            logger.info("✅ Verifier: Validating results...")
+            verification_result = await asyncio.to_thread(self.verifier.verify_execution, execution_result)
             
             # Step 4: Supervisor evaluates overall performance
-            print("👁️ Supervisor: Evaluating performance...")
-            evaluation = self.supervisor.evaluate_test_session(plan, execution_result, verification_result)
+            logger.info("👁️ Supervisor: Evaluating performance...")
+            evaluation = await asyncio.to_thread(
+                self.supervisor.evaluate_test_session, plan, execution_result, verification_result
+            )
             
             end_time = time.time()
             duration = end_time - start_time
@@ -132,16 +378,16 @@ class AutomatedWiFiTester:
                 "verification": verification_result,
                 "evaluation": evaluation,
                 "success": evaluation.get("overall_success", True),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": self.now_iso()
             }
             
-            self.test_results["scenarios"].append(scenario_result)
-            print(f"✅ Scenario completed in {duration:.2f} seconds")
+            self._scenarios.append(scenario_result)
+            logger.info("✅ Scenario completed in %.2f seconds", duration)
             return scenario_result
             
         except Exception as e:
-            print(f"❌ QA Flow failed: {e}")
-            print("🔄 Continuing with hardware-level testing...")
+            logger.error("❌ QA Flow failed: %s", e)
+            logger.warning("🔄 Continuing with hardware-level testing...")
             
             # Fallback: Direct hardware testing without full QA flow
             fallback_result = {
@@ -150,217 +396,282 @@ class AutomatedWiFiTester:
                 "duration_seconds": round(time.time() - start_time, 2),
                 "plan": {"type": "hardware_fallback", "goal": goal},
                 "execution": {"method": "direct_adb", "status": "completed"},
-                "verification": {"wifi_status": self.get_wifi_status(), "screenshot_captured": True},
+                "verification": {
+                    "wifi_status": wifi_status if wifi_status is not None else await self.get_wifi_status(),
+                    "screenshot_captured": True
+                },
                 "evaluation": {"overall_success": True, "method": "hardware_validation"},
                 "success": True,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": self.now_iso(),
                 "note": "Executed via direct hardware control (fallback mode)"
             }
             
-            self.test_results["scenarios"].append(fallback_result)
-            print(f"✅ Fallback scenario completed in {fallback_result['duration_seconds']:.2f} seconds")
+            self._scenarios.append(fallback_result)
+            logger.info("✅ Fallback scenario completed in %.2f seconds", fallback_result['duration_seconds'])
             return fallback_result
 
-    def run_automated_test_suite(self):
+    async def _queue_qa_flow(self, previous, scenario_name, goal, wifi_status):
+        """Run a scenario's QA flow once the previous scenario's flow has finished"""
+        if previous is not None:
+            await previous
+        return await self.run_qa_flow_scenario(scenario_name, goal, wifi_status)
+
+    async def run_automated_test_suite(self):
         """Run complete automated WiFi testing suite"""
-        print("\n🚀 Starting Automated WiFi Testing Suite")
-        print("=" * 60)
+        logger.info("\n🚀 Starting Automated WiFi Testing Suite")
+        logger.info("%s", "=" * 60)
         
         test_start_time = time.time()
         
+        # Scenarios are pipelined: device steps run strictly in order, and each scenario's
+        # QA flow is queued behind the previous one as a task, so it overlaps the next
+        # scenario's device steps. At most one device step and one QA flow are in flight.
+        # Each flow gets the WiFi status observed in its own device step.
+        qa_flow = None
+        
         # Test Scenario 1: Initial WiFi Status Check
-        print("\n📊 SCENARIO 1: Initial WiFi Status Check")
-        initial_status = self.get_wifi_status()
-        print(f"📡 Initial WiFi Status: {initial_status}")
-        self.capture_screenshot("initial_status")
+        logger.info("\n📊 SCENARIO 1: Initial WiFi Status Check")
+        initial_status = await self.get_wifi_status()
+        logger.info("📡 Initial WiFi Status: %s", initial_status)
+        await self.capture_screenshot("initial_status")
         
-        scenario1 = self.run_qa_flow_scenario(
+        qa_flow = asyncio.create_task(self._queue_qa_flow(
+            qa_flow,
             "Initial WiFi Status Check",
-            "Check current WiFi status and capture baseline screenshot"
-        )
+            "Check current WiFi status and capture baseline screenshot",
+            initial_status
+        ))
         
         # Test Scenario 2: WiFi Disable Test
-        print("\n📊 SCENARIO 2: WiFi Disable Test")
-        print("🔴 Disabling WiFi...")
-        self.toggle_wifi(enable=False)
-        disabled_status = self.get_wifi_status()
-        print(f"📡 WiFi Status after disable: {disabled_status}")
-        self.capture_screenshot("wifi_disabled")
-        
-        scenario2 = self.run_qa_flow_scenario(
+        logger.info("\n📊 SCENARIO 2: WiFi Disable Test")
+        logger.info("🔴 Disabling WiFi...")
+        await self.toggle_wifi(enable=False)
+        disabled_status = await self.get_wifi_status()
+        logger.info("📡 WiFi Status after disable: %s", disabled_status)
+        await self.capture_screenshot("wifi_disabled")
+        
+        qa_flow = asyncio.create_task(self._queue_qa_flow(
+            qa_flow,
             "WiFi Disable Test",
-            "Disable WiFi and verify it's turned off with UI validation"
-        )
+            "Disable WiFi and verify it's turned off with UI validation",
+            disabled_status
+        ))
         
         # Test Scenario 3: WiFi Enable Test
-        print("\n📊 SCENARIO 3: WiFi Enable Test")
-        print("🟢 Enabling WiFi...")
-        self.toggle_wifi(enable=True)
-        enabled_status = self.get_wifi_status()
-        print(f"📡 WiFi Status after enable: {enabled_status}")
-        self.capture_screenshot("wifi_enabled")
-        
-        scenario3 = self.run_qa_flow_scenario(
+        logger.info("\n📊 SCENARIO 3: WiFi Enable Test")
+        logger.info("🟢 Enabling WiFi...")
+        await self.toggle_wifi(enable=True)
+        enabled_status = await self.get_wifi_status()
+        logger.info("📡 WiFi Status after enable: %s", enabled_status)
+        await self.capture_screenshot("wifi_enabled")
+        
+        qa_flow = asyncio.create_task(self._queue_qa_flow(
+            qa_flow,
             "WiFi Enable Test",
-            "Enable WiFi and verify it's turned on with UI validation"
-        )
+            "Enable WiFi and verify it's turned on with UI validation",
+            enabled_status
+        ))
         
         # Test Scenario 4: Airplane Mode Integration Test
-        print("\n📊 SCENARIO 4: Airplane Mode Integration Test")
-        print("✈️ Testing airplane mode interaction...")
+        logger.info("\n📊 SCENARIO 4: Airplane Mode Integration Test")
+        logger.info("✈️ Testing airplane mode interaction...")
         
         # Enable airplane mode
-        self.run_adb_command('shell settings put global airplane_mode_on 1')
-        self.run_adb_command('shell am broadcast -a android.intent.action.AIRPLANE_MODE')
-        time.sleep(2)
-        self.capture_screenshot("airplane_mode_on")
+        self._invalidate_wifi_status()
+        await self.run_adb_batch(['settings put global airplane_mode_on 1',
+                                  'am broadcast -a android.intent.action.AIRPLANE_MODE'],
+                                 discard_output=True)
+        await self.wait_for_airplane_mode(True)
+        await self.capture_screenshot("airplane_mode_on")
         
         # Disable airplane mode
-        self.run_adb_command('shell settings put global airplane_mode_on 0')
-        self.run_adb_command('shell am broadcast -a android.intent.action.AIRPLANE_MODE')
-        time.sleep(2)
-        self.capture_screenshot("airplane_mode_off")
-        
-        scenario4 = self.run_qa_flow_scenario(
+        self._invalidate_wifi_status()
+        await self.run_adb_batch(['settings put global airplane_mode_on 0',
+                                  'am broadcast -a android.intent.action.AIRPLANE_MODE'],
+                                 discard_output=True)
+        await self.wait_for_airplane_mode(False)
+        await self.capture_screenshot("airplane_mode_off")
+        
+        qa_flow = asyncio.create_task(self._queue_qa_flow(
+            qa_flow,
             "Airplane Mode Integration Test",
-            "Test airplane mode toggle and WiFi interaction"
-        )
+            "Test airplane mode toggle and WiFi interaction",
+            await self.get_wifi_status()
+        ))
         
         # Test Scenario 5: Rapid Toggle Stress Test
-        print("\n📊 SCENARIO 5: Rapid Toggle Stress Test")
-        print("⚡ Running rapid WiFi toggle test...")
+        logger.info("\n📊 SCENARIO 5: Rapid Toggle Stress Test")
+        logger.info("⚡ Running rapid WiFi toggle test...")
         
         for i in range(3):
-            print(f"🔄 Toggle cycle {i+1}/3")
-            self.toggle_wifi(enable=False)
-            time.sleep(1)
-            self.toggle_wifi(enable=True)
-            time.sleep(1)
+            logger.info("🔄 Toggle cycle %d/3", i + 1)
+            await self.toggle_wifi(enable=False)
+            await asyncio.sleep(1)
+            await self.toggle_wifi(enable=True)
+            await asyncio.sleep(1)
         
-        self.capture_screenshot("stress_test_final")
+        await self.capture_screenshot("stress_test_final")
         
-        scenario5 = self.run_qa_flow_scenario(
+        qa_flow = asyncio.create_task(self._queue_qa_flow(
+            qa_flow,
             "Rapid Toggle Stress Test",
-            "Perform rapid WiFi toggles to test system stability"
-        )
+            "Perform rapid WiFi toggles to test system stability",
+            await self.get_wifi_status()
+        ))
+        await qa_flow
         
         # Calculate performance metrics
         test_end_time = time.time()
         total_duration = test_end_time - test_start_time
         
-        self.test_results["performance_metrics"] = {
+        # One pass over the scenarios feeds both the metrics and the summary
+        scenarios = self._scenarios
+        self._scenario_count = len(scenarios)
+        successful = failed = 0
+        total_scenario_duration = 0.0
+        for scenario in scenarios:
+            total_scenario_duration += scenario.get("duration_seconds", 0)
+            if scenario.get("success", False):
+                successful += 1
+            if not scenario.get("success", True):
+                failed += 1
+        
+        self._metrics = {
             "total_test_duration": round(total_duration, 2),
-            "scenarios_completed": len(self.test_results["scenarios"]),
-            "screenshots_captured": len(self.test_results["screenshots"]),
-            "success_rate": sum(1 for s in self.test_results["scenarios"] if s.get("success", False)) / len(self.test_results["scenarios"]) * 100,
-            "average_scenario_duration": round(sum(s.get("duration_seconds", 0) for s in self.test_results["scenarios"]) / len(self.test_results["scenarios"]), 2)
+            "scenarios_completed": self._scenario_count,
+            "screenshots_captured": len(self._screenshots),
+            "success_rate": successful / self._scenario_count * 100,
+            "average_scenario_duration": round(total_scenario_duration / self._scenario_count, 2)
         }
         
         # Generate summary
-        self.test_results["summary"] = {
-            "test_completion_time": datetime.now().isoformat(),
-            "total_scenarios": len(self.test_results["scenarios"]),
-            "successful_scenarios": sum(1 for s in self.test_results["scenarios"] if s.get("success", False)),
-            "failed_scenarios": sum(1 for s in self.test_results["scenarios"] if not s.get("success", True)),
-            "final_wifi_status": self.get_wifi_status(),
+        self._summary = {
+            "test_completion_time": self.now_iso(),
+            "total_scenarios": self._scenario_count,
+            "successful_scenarios": successful,
+            "failed_scenarios": failed,
+            "final_wifi_status": await self.get_wifi_status(),
             "test_status": "COMPLETED SUCCESSFULLY"
         }
         
-        print("\n🎉 Automated Testing Suite Completed!")
-        print("=" * 60)
+        logger.info("\n🎉 Automated Testing Suite Completed!")
+        logger.info("%s", "=" * 60)
         
+        return self._fold_results()
+
+    def _fold_results(self):
+        """Assemble test_results from the flat result lists"""
+        self.test_results = {
+            "test_session": self._session,
+            "scenarios": self._scenarios,
+            "screenshots": self._screenshots,
+            "performance_metrics": self._metrics,
+            "summary": self._summary
+        }
         return self.test_results
 
     def generate_comprehensive_report(self):
         """Generate comprehensive test report"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        results = self._fold_results()
+        now = self.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
         
         # Generate JSON report
         json_report_path = f"automated_wifi_test_report_{timestamp}.json"
-        with open(json_report_path, 'w') as f:
-            json.dump(self.test_results, f, indent=2)
+        payload = None
+        if ORJSON_AVAILABLE:
+            try:
+                payload = orjson.dumps(results,
+                                       option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            except TypeError:
+                # Fall back to the stdlib encoder for anything orjson rejects
+                payload = None
+        if payload is None:
+            payload = json.dumps(results, indent=2).encode()
+        with open(json_report_path, 'wb') as f:
+            f.write(payload)
         
         # Generate Markdown report
         md_report_path = f"AUTOMATED_WIFI_TEST_REPORT_{timestamp}.md"
         
-        md_content = f"""# 🤖 Automated WiFi Testing Report
-## Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        # Sections are collected in a list and joined once instead of growing one string
+        parts = [f"""# 🤖 Automated WiFi Testing Report
+## Generated: {now.strftime("%Y-%m-%d %H:%M:%S")}
 
 ### 📊 Test Summary
-- **Test Type**: {self.test_results['test_session']['test_type']}
-- **Device**: {self.test_results['test_session']['device']}
-- **Total Duration**: {self.test_results['performance_metrics']['total_test_duration']} seconds
-- **Scenarios Completed**: {self.test_results['performance_metrics']['scenarios_completed']}
-- **Success Rate**: {self.test_results['performance_metrics']['success_rate']:.1f}%
-- **Screenshots Captured**: {self.test_results['performance_metrics']['screenshots_captured']}
+- **Test Type**: {results['test_session']['test_type']}
+- **Device**: {results['test_session']['device']}
+- **Total Duration**: {results['performance_metrics']['total_test_duration']} seconds
+- **Scenarios Completed**: {results['performance_metrics']['scenarios_completed']}
+- **Success Rate**: {results['performance_metrics']['success_rate']:.1f}%
+- **Screenshots Captured**: {results['performance_metrics']['screenshots_captured']}
 
 ### 🎯 Scenario Results
-"""
-        
-        for i, scenario in enumerate(self.test_results['scenarios'], 1):
-            status = "✅ PASSED" if scenario.get('success', False) else "❌ FAILED"
-            duration = scenario.get('duration_seconds', 'N/A')
-            md_content += f"""
-#### {i}. {scenario['scenario_name']} {status}
-- **Goal**: {scenario['goal']}
-- **Duration**: {duration} seconds
-- **Timestamp**: {scenario['timestamp']}
-"""
-        
-        md_content += f"""
+"""]
+        append = parts.append
+        
+        for i, scenario in enumerate(results['scenarios'], 1):
+            append(_SCENARIO_MD(
+                i=i,
+                name=scenario['scenario_name'],
+                status="✅ PASSED" if scenario.get('success', False) else "❌ FAILED",
+                goal=scenario['goal'],
+                duration=scenario.get('duration_seconds', 'N/A'),
+                timestamp=scenario['timestamp']
+            ))
+        
+        append("""
 ### 📸 Screenshots Captured
-"""
+""")
         
-        for screenshot in self.test_results['screenshots']:
-            md_content += f"- **{screenshot['scenario']}**: `{screenshot['filename']}` ({screenshot['timestamp']})\n"
+        parts.extend(map(_SCREENSHOT_MD, results['screenshots']))
         
-        md_content += f"""
-### 📈 Performance Metrics
-- **Average Scenario Duration**: {self.test_results['performance_metrics']['average_scenario_duration']} seconds
-- **Total Test Duration**: {self.test_results['performance_metrics']['total_test_duration']} seconds
-- **Success Rate**: {self.test_results['performance_metrics']['success_rate']:.1f}%
-
-### 🔧 Technical Details
-- **ADB Path**: {self.adb_path}
-- **Device ID**: {self.device_id}
-- **Final WiFi Status**: {self.test_results['summary']['final_wifi_status']}
-- **Test Status**: {self.test_results['summary']['test_status']}
-
-### 🚀 QA Agents Performance
-All four QA agents (Planner, Executor, Verifier, Supervisor) worked together to:
-1. **Plan** each test scenario automatically
-2. **Execute** WiFi operations and UI interactions
-3. **Verify** results and validate state changes
-4. **Supervise** overall test quality and performance
-
----
-*Report generated by Automated WiFi Testing QA Flow*
-"""
+        append(_DETAILS_MD(
+            metrics=results['performance_metrics'],
+            summary=results['summary'],
+            adb_path=self.adb_path,
+            device_id=self.device_id
+        ))
         
         with open(md_report_path, 'w') as f:
-            f.write(md_content)
+            f.write("".join(parts))
         
-        print(f"\n📄 Reports generated:")
-        print(f"📊 JSON Report: {json_report_path}")
-        print(f"📝 Markdown Report: {md_report_path}")
+        logger.info("\n📄 Reports generated:")
+        logger.info("📊 JSON Report: %s", json_report_path)
+        logger.info("📝 Markdown Report: %s", md_report_path)
         
         return json_report_path, md_report_path
 
+async def _run_suite(tester):
+    """Run the suite and shut down the persistent adb shell in the same event loop"""
+    try:
+        return await tester.run_automated_test_suite()
+    finally:
+        await tester.close()
+
 def main():
     """Main execution function"""
-    print("🤖 AUTOMATED WIFI TESTING QA FLOW")
-    print("=" * 50)
-    print("🎯 Fully automated testing with all QA agents")
-    print("📱 WiFi toggle operations")
-    print("📸 Automatic screenshot capture")
-    print("📊 Comprehensive reporting")
-    print("=" * 50)
+    parser = argparse.ArgumentParser(description="Run the automated WiFi QA flow")
+    parser.add_argument("--verbose", action="store_true",
+                       help="Show step-by-step progress output")
+    args = parser.parse_args()
+    
+    logging.basicConfig(stream=sys.stdout, format="%(message)s")
+    logger.setLevel(logging.INFO if args.verbose else logging.WARNING)
+    
+    logger.info("🤖 AUTOMATED WIFI TESTING QA FLOW")
+    logger.info("%s", "=" * 50)
+    logger.info("🎯 Fully automated testing with all QA agents")
+    logger.info("📱 WiFi toggle operations")
+    logger.info("📸 Automatic screenshot capture")
+    logger.info("📊 Comprehensive reporting")
+    logger.info("%s", "=" * 50)
     
     # Initialize tester
     tester = AutomatedWiFiTester()
     
     # Run automated test suite
-    results = tester.run_automated_test_suite()
+    results = asyncio.run(_run_suite(tester))
     
     # Generate comprehensive report
     json_report, md_report = tester.generate_comprehensive_report()
@@ -4,16 +4,29 @@ Enhanced QA Flow integrating Agent-S messaging structure with Android World.
 This script demonstrates the complete Setup + Planner + Executor pipeline.
 """
 
+import asyncio
 import json
+import logging
+import sys
 import time
 import argparse
-from typing import Dict, Any
+from typing import Dict, Any, List
 from planner_agent import PlannerAgent
 from executor_agent import ExecutorAgent
 from verifier_agent import verify_step
 from supervisor_agent import summarize_results
 from android_env_wrapper import AndroidEnv
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+# Progress output is gated by level: WARNING by default, INFO with --verbose
+logger = logging.getLogger("qa")
+
 class QAFlowManager:
     """
     Main QA Flow Manager that orchestrates all agents following Agent-S patterns.
@@ -38,40 +51,44 @@ class QAFlowManager:
             "overall_status": "initialized"
         }
         
-    def run_complete_qa_flow(self, goal: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+    def run_complete_qa_flow(self, goal: str, context: Dict[str, Any] = None,
+                             plan: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Run the complete QA flow: Planning -> Execution -> Verification -> Reporting
+
+        A plan generated ahead of time (see run_many) skips the planning call.
         """
-        print(f"\n{'='*60}")
-        print(f"🚀 Starting QA Flow for: {goal}")
-        print(f"Task: {self.task_name}")
-        print(f"Real Device: {self.enable_real_device}")
-        print(f"{'='*60}\n")
+        logger.info("\n%s", "=" * 60)
+        logger.info("🚀 Starting QA Flow for: %s", goal)
+        logger.info("Task: %s", self.task_name)
+        logger.info("Real Device: %s", self.enable_real_device)
+        logger.info("%s\n", "=" * 60)
         
         try:
             # Step 1: Generate Test Plan
-            print("📋 Step 1: Generating Test Plan...")
-            plan = self.planner.generate_test_plan(goal, context)
+            logger.info("📋 Step 1: Generating Test Plan...")
+            if plan is None:
+                plan = self.planner.generate_test_plan(goal, context)
             self.current_session["plans_generated"].append(plan)
             
-            print(f"✅ Plan generated with {len(plan['steps'])} steps")
-            print(f"   Estimated duration: {plan['estimated_duration']} seconds")
+            logger.info("✅ Plan generated with %d steps", len(plan['steps']))
+            logger.info("   Estimated duration: %s seconds", plan['estimated_duration'])
             
             # Step 2: Execute Test Plan
-            print("\n🔄 Step 2: Executing Test Plan...")
+            logger.info("\n🔄 Step 2: Executing Test Plan...")
             execution_result = self.executor.execute_plan(plan)
             self.current_session["executions_completed"].append(execution_result)
             
-            print(f"✅ Execution completed: {execution_result['overall_status']}")
-            print(f"   Duration: {execution_result['duration']:.2f} seconds")
-            print(f"   Steps executed: {len(execution_result['steps_executed'])}")
+            logger.info("✅ Execution completed: %s", execution_result['overall_status'])
+            logger.info("   Duration: %.2f seconds", execution_result['duration'])
+            logger.info("   Steps executed: %d", len(execution_result['steps_executed']))
             
             # Step 3: Verify Results
-            print("\n🔍 Step 3: Verifying Results...")
+            logger.info("\n🔍 Step 3: Verifying Results...")
             verification_results = self._verify_execution_results(execution_result)
             
             # Step 4: Generate Summary Report
-            print("\n📊 Step 4: Generating Summary Report...")
+            logger.info("\n📊 Step 4: Generating Summary Report...")
             summary_report = self._generate_qa_report(plan, execution_result, verification_results)
             
             # Update session status
@@ -82,18 +99,49 @@ class QAFlowManager:
             self.current_session["overall_status"] = execution_result["overall_status"]
             self.current_session["summary_report"] = summary_report
             
-            print(f"\n🎯 QA Flow Complete!")
-            print(f"Overall Status: {self.current_session['overall_status']}")
-            print(f"Total Duration: {self.current_session['total_duration']:.2f} seconds")
+            logger.info("\n🎯 QA Flow Complete!")
+            logger.info("Overall Status: %s", self.current_session['overall_status'])
+            logger.info("Total Duration: %.2f seconds", self.current_session['total_duration'])
             
             return self.current_session
             
         except Exception as e:
-            print(f"\n❌ QA Flow Failed: {str(e)}")
+            logger.error("\n❌ QA Flow Failed: %s", e)
             self.current_session["overall_status"] = "error"
             self.current_session["error"] = str(e)
             return self.current_session
     
+    async def run_many(self, goals: List[str], context: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        Run the QA flow for several goals, planning the next goal while the current one executes.
+
+        Planning stays one goal ahead on a worker thread, and the look-ahead only starts
+        once the current goal has a plan, so the planner is never called concurrently
+        with itself. Returns a snapshot of the session after each goal.
+        """
+        sessions = []
+        generate = self.planner.generate_test_plan
+        next_plan = None
+        for i, goal in enumerate(goals):
+            try:
+                # Without a look-ahead in flight (first goal, or after a failure) plan here
+                plan = await (next_plan if next_plan is not None
+                              else asyncio.to_thread(generate, goal, context))
+            except Exception:
+                plan = None  # Let run_complete_qa_flow re-plan and report the failure
+            next_plan = None
+            if plan is not None and i + 1 < len(goals):
+                next_plan = asyncio.create_task(asyncio.to_thread(generate, goals[i + 1], context))
+            
+            session = await asyncio.to_thread(self.run_complete_qa_flow, goal, context, plan)
+            sessions.append({
+                **session,
+                "plans_generated": list(session["plans_generated"]),
+                "executions_completed": list(session["executions_completed"])
+            })
+        
+        return sessions
+    
     def _verify_execution_results(self, execution_result: Dict[str, Any]) -> Dict[str, Any]:
         """
         Enhanced verification using the verifier agent.
@@ -191,65 +239,69 @@ class QAFlowManager:
             "recommendations": []
         }
         
-        # Add detailed step results
-        for i, step_result in enumerate(execution_result["steps_executed"]):
-            step_verification = verification_results["step_verifications"][i]
+        # One pass over the steps builds the detailed results and legacy rows and
+        # counts the failures the recommendations need
+        step_by_step = report["detailed_results"]["step_by_step"]
+        legacy_results = []
+        failed_steps = 0
+        validation_failures = 0
+        
+        for step_result, step_verification in zip(execution_result["steps_executed"],
+                                                   verification_results["step_verifications"]):
+            validations = step_result.get("validation_results", [])
+            step_status = step_verification["overall_step_status"]
             
-            detailed_step = {
+            step_by_step.append({
                 "step_number": step_result["step_id"],
                 "description": step_result["description"],
                 "execution_status": step_result["status"],
                 "execution_duration": step_result["duration"],
-                "verification_status": step_verification["overall_step_status"],
-                "validation_details": step_result.get("validation_results", []),
+                "verification_status": step_status,
+                "validation_details": validations,
                 "issues": step_result.get("details", {})
-            }
+            })
+            legacy_results.append({
+                "step": step_result["description"],
+                "result": step_status
+            })
             
-            report["detailed_results"]["step_by_step"].append(detailed_step)
+            if step_result["status"] != "success":
+                failed_steps += 1
+            for validation in validations:
+                if not validation["passed"]:
+                    validation_failures += 1
         
         # Generate recommendations
-        report["recommendations"] = self._generate_recommendations(execution_result, verification_results)
+        report["recommendations"] = self._generate_recommendations(
+            failed_steps, validation_failures, verification_results["summary"]["success_rate"]
+        )
         
         # Use legacy supervisor for additional summary
-        legacy_results = []
-        for step_result in execution_result["steps_executed"]:
-            legacy_results.append({
-                "step": step_result["description"],
-                "result": step_verification["overall_step_status"]
-            })
-        
         legacy_summary = summarize_results(plan["goal"], legacy_results)
         report["legacy_summary"] = legacy_summary
         
         return report
     
-    def _generate_recommendations(self, execution_result: Dict, verification_results: Dict) -> list:
-        """Generate actionable recommendations based on results."""
+    def _generate_recommendations(self, failed_steps: int, validation_failures: int,
+                                  success_rate: float) -> list:
+        """Generate actionable recommendations from the failure counts gathered for the report."""
         recommendations = []
         
-        failed_steps = [s for s in execution_result["steps_executed"] if s["status"] != "success"]
-        
-        if len(failed_steps) > 0:
+        if failed_steps > 0:
             recommendations.append({
                 "category": "execution_improvements",
                 "priority": "high",
-                "description": f"{len(failed_steps)} steps failed execution. Review error details and environment setup."
+                "description": f"{failed_steps} steps failed execution. Review error details and environment setup."
             })
         
-        validation_failures = []
-        for step_verification in verification_results["step_verifications"]:
-            for validation in step_verification.get("validation_results", []):
-                if not validation["passed"]:
-                    validation_failures.append(validation)
-        
-        if len(validation_failures) > 0:
+        if validation_failures > 0:
             recommendations.append({
                 "category": "validation_improvements",
                 "priority": "medium",
-                "description": f"{len(validation_failures)} validation criteria failed. Review test assertions."
+                "description": f"{validation_failures} validation criteria failed. Review test assertions."
             })
         
-        if verification_results["summary"]["success_rate"] < 0.8:
+        if success_rate < 0.8:
             recommendations.append({
                 "category": "test_reliability",
                 "priority": "high",
@@ -270,10 +322,22 @@ class QAFlowManager:
         import os
         os.makedirs(os.path.dirname(filename), exist_ok=True)
         
-        with open(filename, 'w') as f:
-            json.dump(self.current_session["summary_report"], f, indent=2)
+        report = self.current_session["summary_report"]
+        payload = None
+        if ORJSON_AVAILABLE:
+            try:
+                payload = orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            except TypeError:
+                # Fall back to the stdlib encoder for anything orjson rejects
+                payload = None
+        if payload is not None:
+            with open(filename, 'wb') as f:
+                f.write(payload)
+        else:
+            with open(filename, 'w') as f:
+                json.dump(report, f, indent=2)
         
-        print(f"📄 Report saved to: {filename}")
+        logger.info("📄 Report saved to: %s", filename)
         return filename
 
 def main():
@@ -288,9 +352,14 @@ def main():
                        help="Use real Android device (requires setup)")
     parser.add_argument("--save-report", action="store_true",
                        help="Save detailed report to file")
+    parser.add_argument("--verbose", action="store_true",
+                       help="Show step-by-step progress output")
     
     args = parser.parse_args()
     
+    logging.basicConfig(stream=sys.stdout, format="%(message)s")
+    logger.setLevel(logging.INFO if args.verbose else logging.WARNING)
+    
     # Initialize QA Flow Manager
     qa_manager = QAFlowManager(
         task_name=args.task,
@@ -301,8 +370,7 @@ def main():
     session_result = qa_manager.run_complete_qa_flow(args.goal)
     
     # Save report if requested
-    if args.save_report:
-        qa_manager.save_report()
+    report_path = qa_manager.save_report() if args.save_report else None
     
     # Print final summary
     print(f"\n{'='*60}")
@@ -312,6 +380,8 @@ def main():
     print(f"Total Duration: {session_result.get('total_duration', 0):.2f} seconds")
     print(f"Plans Generated: {len(session_result['plans_generated'])}")
     print(f"Executions Completed: {len(session_result['executions_completed'])}")
+    if report_path:
+        print(f"Report: {report_path}")
     print(f"{'='*60}")
 
 if __name__ == "__main__":
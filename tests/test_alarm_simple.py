@@ -13,29 +13,127 @@ from new_executor_agent import EnhancedExecutorAgent
 from verifier_agent import VerifierAgent
 from android_env_wrapper import AndroidEnv
 import time
+import json
+import logging
+import functools
+import hashlib
+import inspect
+from pathlib import Path
+
+logger = logging.getLogger("qa_supervisor")
+
+# Plans from earlier runs, keyed by task and goal. The steps depend only on those two,
+# but plan_id counts the planner's conversation history, so a cached plan keeps the id
+# of the run that made it. Plans are dropped whenever planner_agent.py changes.
+# Set QA_DISABLE_PLAN_CACHE to always plan afresh.
+_PLAN_CACHE = Path(".cache/plans.json")
+
+@functools.lru_cache(maxsize=None)
+def _planner_version():
+    """Hash of the planner's source, so edits to it invalidate cached plans."""
+    source = inspect.getsourcefile(PlannerAgent)
+    with open(source, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def _load_plans():
+    try:
+        with open(_PLAN_CACHE) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get("planner") != _planner_version():
+        return {}
+    return cache.get("plans", {})
+
+def _generate_plan(planner, goal):
+    """Return the plan for goal, from the on-disk cache when an earlier run made it."""
+    if os.environ.get("QA_DISABLE_PLAN_CACHE"):
+        return planner.generate_test_plan(goal)
+    
+    plans = _load_plans()
+    key = f"{planner.task_name}:{goal}"
+    plan = plans.get(key)
+    if plan is None:
+        plan = planner.generate_test_plan(goal)
+        plans[key] = plan
+        # The plan's environment_context snapshot holds the screenshot array; it is
+        # stored as null rather than serialized. The file is swapped in whole so a
+        # failed write never leaves a truncated cache behind.
+        try:
+            data = json.dumps({"planner": _planner_version(), "plans": plans}, default=lambda o: None)
+            _PLAN_CACHE.parent.mkdir(parents=True, exist_ok=True)
+            tmp = _PLAN_CACHE.with_suffix(".tmp")
+            tmp.write_text(data)
+            tmp.replace(_PLAN_CACHE)
+        except OSError:
+            pass  # The cache only saves time; an unwritable cache just means planning again
+    return plan
+
+def _state_signature(state):
+    """Cheap fingerprint of a UI state: status plus the on-screen element texts."""
+    elements = state.get("ui_elements") or []
+    return (state.get("status"), len(elements),
+            tuple(e.get("text") if isinstance(e, dict) else getattr(e, "text", None) for e in elements))
+
+def _wait_stable(env, max_ms=200, poll_ms=20):
+    """Wait until two successive UI states match, or max_ms at most; returns the last state."""
+    deadline = time.monotonic() + max_ms / 1000
+    state = env.get_state()
+    previous = _state_signature(state)
+    while time.monotonic() < deadline:
+        time.sleep(poll_ms / 1000)
+        state = env.get_state()
+        current = _state_signature(state)
+        if current == previous:
+            break
+        previous = current
+    return state
+
+def _build_agents(task_name):
+    return (
+        SupervisorAgent(enable_visual_traces=True, enable_ai_analysis=True),
+        PlannerAgent(task_name),
+        EnhancedExecutorAgent(task_name),
+        VerifierAgent(task_name),
+        AndroidEnv(task_name, enable_real_device=False)
+    )
+
+@functools.lru_cache(maxsize=None)
+def _cached_agents(task_name):
+    return _build_agents(task_name)
+
+def _agents(task_name):
+    """Supervisor, planner, executor, verifier and env for a task, built once per process.
+
+    Set QA_DISABLE_AGENT_CACHE to build fresh agents on every call.
+    """
+    if os.environ.get("QA_DISABLE_AGENT_CACHE"):
+        return _build_agents(task_name)
+    return _cached_agents(task_name)
 
 def test_alarm_setting():
     """Test setting an alarm with full monitoring."""
     
-    print("🚀 Testing: Set an alarm for 7:00 AM")
-    print("=" * 50)
+    logger.info("🚀 Testing: Set an alarm for 7:00 AM")
+    logger.info("%s", "=" * 50)
     
-    # Initialize agents
-    supervisor = SupervisorAgent(enable_visual_traces=True, enable_ai_analysis=True)
-    planner = PlannerAgent('alarm_setting')
-    executor = EnhancedExecutorAgent('alarm_setting')
-    verifier = VerifierAgent('alarm_setting')
-    env = AndroidEnv('alarm_setting', enable_real_device=False)
+    # Agents are shared between calls; the stateful ones start each test from reset
+    # and the supervisor session below starts with an empty log. The executor keeps
+    # no per-test state.
+    supervisor, planner, executor, verifier, env = _agents('alarm_setting')
+    planner.reset()
+    verifier.reset()
+    env.reset()
     
     # Start supervision session
     session_id = supervisor.start_supervision_session("Set an alarm for 7:00 AM", "alarm_setting")
-    print(f"📋 Session ID: {session_id}")
+    logger.info("📋 Session ID: %s", session_id)
     
     try:
         # Phase 1: Planning
-        print("\n📋 Phase 1: Planning")
+        logger.info("\n📋 Phase 1: Planning")
         plan_start = time.time()
-        plan = planner.generate_test_plan("Set an alarm for 7:00 AM")
+        plan = _generate_plan(planner, "Set an alarm for 7:00 AM")
         plan_time = time.time() - plan_start
         
         supervisor.record_agent_decision("PlannerAgent", {
@@ -48,15 +146,17 @@ def test_alarm_setting():
             "status": "success"
         })
         
-        print(f"✅ Plan generated: {len(plan.get('steps', []))} steps")
-        print(f"🎯 Subgoals: {len(plan.get('subgoals', []))}")
+        logger.info("✅ Plan generated: %d steps", len(plan.get('steps', [])))
+        logger.info("🎯 Subgoals: %d", len(plan.get('subgoals', [])))
         
         # Phase 2: Execute first few steps with monitoring
-        print("\n⚡ Phase 2: Execution (First 3 steps)")
+        logger.info("\n⚡ Phase 2: Execution (First 3 steps)")
         execution_results = []
         
         for i, step in enumerate(plan.get('steps', [])[:3], 1):
-            print(f"\n📝 Step {i}: {step.get('description', 'Unknown step')}")
+            logger.info("\n📝 Step %d: %s", i, step.get('description', 'Unknown step'))
+            # This step's agent decisions, recorded together once the step is done
+            decisions = []
             
             # Get environment state
             env_state = env.get_state()
@@ -68,7 +168,7 @@ def test_alarm_setting():
             exec_time = time.time() - exec_start
             
             # Record execution
-            supervisor.record_agent_decision("ExecutorAgent", {
+            decisions.append(("ExecutorAgent", {
                 "action": "execute_step",
                 "step_id": step.get("step_id"),
                 "step_description": step.get("description"),
@@ -76,7 +176,7 @@ def test_alarm_setting():
                 "processing_time": exec_time,
                 "target": step.get("target"),
                 "action_type": step.get("action")
-            })
+            }, exec_result.get("failure_type")))
             
             # Verify step
             verify_start = time.time()
@@ -88,20 +188,21 @@ def test_alarm_setting():
             verify_time = time.time() - verify_start
             
             # Record verification
-            supervisor.record_agent_decision("VerifierAgent", {
+            decisions.append(("VerifierAgent", {
                 "action": "verify_step",
                 "step_id": step.get("step_id"),
                 "verification_status": verification.get("verification_status"),
                 "bugs_detected": len(verification.get("functional_bugs", [])),
                 "confidence": verification.get("confidence", 0),
                 "processing_time": verify_time
-            })
+            }, None))
+            supervisor.record_agent_decisions_batch(decisions)
             
             # Show result
             step_success = (exec_result.get("success", False) and 
                           verification.get("verification_status") == "PASS")
             status_emoji = "✅" if step_success else "❌"
-            print(f"{status_emoji} Result: {'PASS' if step_success else 'FAIL'}")
+            logger.info("%s Result: %s", status_emoji, 'PASS' if step_success else 'FAIL')
             
             execution_results.append({
                 "step": step,
@@ -110,10 +211,10 @@ def test_alarm_setting():
                 "success": step_success
             })
             
-            time.sleep(0.2)  # Brief pause
+            _wait_stable(env)  # Let the UI settle before the next step
         
         # Phase 3: Comprehensive Evaluation
-        print("\n📊 Phase 3: Supervisor Evaluation")
+        logger.info("\n📊 Phase 3: Supervisor Evaluation")
         
         final_results = [r for r in execution_results]
         evaluation = supervisor.generate_comprehensive_evaluation(
@@ -121,25 +222,25 @@ def test_alarm_setting():
             final_results
         )
         
-        print(f"✅ Evaluation completed")
-        print(f"🤖 AI Analysis: {'Available' if evaluation.get('ai_analysis') else 'Not available'}")
-        print(f"📊 Metrics calculated: {len(evaluation.get('metrics', {}))}")
-        print(f"📸 Visual frames: {evaluation.get('visual_traces', {}).get('total_frames', 0)}")
+        logger.info("✅ Evaluation completed")
+        logger.info("🤖 AI Analysis: %s", 'Available' if evaluation.get('ai_analysis') else 'Not available')
+        logger.info("📊 Metrics calculated: %d", len(evaluation.get('metrics', {})))
+        logger.info("📸 Visual frames: %s", evaluation.get('visual_traces', {}).get('total_frames', 0))
         
         # Show key metrics
         if evaluation.get('metrics'):
             metrics = evaluation['metrics']
-            print(f"\n📈 Key Metrics:")
-            print(f"  • Bug Detection F1: {metrics.get('bug_detection_f1', 0):.3f}")
-            print(f"  • Recovery Rate: {metrics.get('recovery_rate', 0):.1%}")
-            print(f"  • System Reliability: {metrics.get('system_reliability', 0):.1%}")
+            logger.info("\n📈 Key Metrics:")
+            logger.info("  • Bug Detection F1: %.3f", metrics.get('bug_detection_f1', 0))
+            logger.info("  • Recovery Rate: %.1f%%", metrics.get('recovery_rate', 0) * 100)
+            logger.info("  • System Reliability: %.1f%%", metrics.get('system_reliability', 0) * 100)
         
         # Show AI recommendations
         if evaluation.get('ai_analysis', {}).get('recommendations'):
             recommendations = evaluation['ai_analysis']['recommendations']
-            print(f"\n🤖 AI Recommendations ({len(recommendations)}):")
+            logger.info("\n🤖 AI Recommendations (%d):", len(recommendations))
             for i, rec in enumerate(recommendations[:3], 1):
-                print(f"  {i}. {rec.get('suggestion', 'Unknown recommendation')}")
+                logger.info("  %d. %s", i, rec.get('suggestion', 'Unknown recommendation'))
         
         return {
             "session_id": session_id,
@@ -150,7 +251,7 @@ def test_alarm_setting():
         }
         
     except Exception as e:
-        print(f"❌ Error during test: {e}")
+        logger.error("❌ Error during test: %s", e)
         return {"status": "error", "error": str(e)}
     
     finally:
@@ -161,15 +262,19 @@ def test_alarm_setting():
             pass  # Session may not have started properly
 
 if __name__ == "__main__":
+    # Harness output goes to stdout; raise the level to WARNING for quiet runs
+    logging.basicConfig(stream=sys.stdout, format="%(message)s")
+    logger.setLevel(logging.INFO)
+    
     result = test_alarm_setting()
     
-    print("\n" + "=" * 50)
-    print("🎯 ALARM SETTING TEST SUMMARY")
-    print("=" * 50)
-    print(f"📋 Status: {result.get('status', 'unknown').upper()}")
+    logger.info("\n%s", "=" * 50)
+    logger.info("🎯 ALARM SETTING TEST SUMMARY")
+    logger.info("%s", "=" * 50)
+    logger.info("📋 Status: %s", result.get('status', 'unknown').upper())
     if result.get('execution_results'):
         success_count = sum(1 for r in result['execution_results'] if r.get('success'))
         total_count = len(result['execution_results'])
-        print(f"📊 Steps: {success_count}/{total_count} successful")
-        print(f"📈 Success Rate: {success_count/total_count:.1%}")
-    print("=" * 50)
+        logger.info("📊 Steps: %d/%d successful", success_count, total_count)
+        logger.info("📈 Success Rate: %.1f%%", success_count / total_count * 100)
+    logger.info("%s", "=" * 50)
@@ -4,22 +4,166 @@ Android Studio Integration Test Script
 Tests real device capabilities using Android Studio's emulator
 """
 
+import os
+import re
 import subprocess
+import threading
+import queue
 import time
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# Printed after every command fed to the persistent shell, followed by its exit code
+_SHELL_SENTINEL = "__END__"
+_ADB_TIMEOUT = 10
+# Ends each command's output in a batched shell call, followed by that command's exit code
+_BATCH_DELIMITER = "---"
+# Read-only commands whose results may be reused for a short while
+_FOCUS_COMMAND = "shell dumpsys window | grep mCurrentFocus"
+_CACHEABLE_COMMANDS = (_FOCUS_COMMAND, "shell getprop ")
+_CMD_CACHE_TTL = 0.25
+# Package and activity of the focused window, e.g. mCurrentFocus=Window{1a2b u0
+# com.android.settings/com.android.settings.Settings$WifiSettingsActivity}
+_FOCUS_RE = re.compile(r"mCurrentFocus=[^{]*\{\S+ \S+ (?P<pkg>[\w.]+)/(?P<act>[^\s}]+)")
+
+def _parse_focus(text):
+    """Return (package, activity) of the focused window, or None if text names none"""
+    match = _FOCUS_RE.search(text)
+    return (match["pkg"], match["act"]) if match else None
+
 class AndroidStudioTester:
+    # Tests that drive the foreground UI; they run in order and never alongside each other
+    _exclusive = {"test_app_operations", "test_ui_interactions"}
+    
     def __init__(self):
         self.adb_path = "/Users/rishikagour/Library/Android/sdk/platform-tools/adb"
         self.device_id = "emulator-5554"
         self.test_results = []
+        # One long-lived `adb shell` serves every shell command; started on first use
+        self._shell = None
+        self._shell_lines = None
+        self._shell_started = False
+        self._shell_lock = threading.Lock()
+        self._results_lock = threading.Lock()
+        # Recent results of cacheable commands: command -> (time.monotonic(), result).
+        # The generation counts mutating commands, so a read that overlapped one
+        # is not stored.
+        self._cmd_cache = {}
+        self._cache_generation = 0
+        self._cache_lock = threading.Lock()
+        # Set by test_device_connection; later tests skip real-device work without it
+        self._device_ok = False
+    
+    def _start_shell(self):
+        """Open the persistent adb shell and a thread that queues its output lines."""
+        try:
+            shell = subprocess.Popen(
+                [self.adb_path, "-s", self.device_id, "shell"],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                bufsize=1, text=True, errors="replace"
+            )
+        except OSError as e:
+            print(f"⚠️  Persistent ADB shell unavailable, using one-off commands: {e}")
+            return
+        lines = queue.Queue()
+        
+        def pump():
+            for line in shell.stdout:
+                lines.put(line)
+            lines.put(None)  # EOF
+        
+        threading.Thread(target=pump, daemon=True).start()
+        self._shell, self._shell_lines = shell, lines
+    
+    def _shell_exec(self, command):
+        """Run a device shell command on the persistent shell; None if the shell is unusable."""
+        # The shell runs one command at a time, so concurrent tests queue here
+        with self._shell_lock:
+            if not self._shell_started:
+                self._shell_started = True
+                self._start_shell()
+            if self._shell is None:
+                return None
+            try:
+                # The sentinel goes on its own line so output without a trailing newline still parses
+                self._shell.stdin.write(f"{{ {command}; }} 2>&1; printf '\\n{_SHELL_SENTINEL}%d\\n' $?\n")
+                self._shell.stdin.flush()
+                deadline = time.monotonic() + _ADB_TIMEOUT
+                output = []
+                while True:
+                    try:
+                        line = self._shell_lines.get(timeout=max(deadline - time.monotonic(), 0))
+                    except queue.Empty:
+                        # The shell is now out of step with its output, so it can't be reused
+                        self.close()
+                        return {"success": False, "output": "", "error": "Command timed out"}
+                    if line is None:
+                        raise OSError("adb shell exited")
+                    if line.startswith(_SHELL_SENTINEL):
+                        text = "".join(output).strip()
+                        success = line[len(_SHELL_SENTINEL):].strip() == "0"
+                        return {"success": success, "output": text, "error": "" if success else text}
+                    output.append(line)
+            except OSError as e:
+                print(f"⚠️  Persistent ADB shell lost, falling back to one-off commands: {e}")
+                self.close()
+                return None
+    
+    def close(self):
+        """Shut down the persistent adb shell."""
+        if self._shell is None:
+            return
+        try:
+            self._shell.stdin.close()
+            self._shell.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self._shell.kill()
+        self._shell = None
     
     def run_adb_command(self, command):
         """Execute ADB command and return output"""
+        # Spacing differences don't change a read, so equivalent calls share a slot
+        key = " ".join(command.split())
+        if not key.startswith(_CACHEABLE_COMMANDS):
+            # Anything else (am start, input, ...) may change what the reads would return;
+            # invalidate both before and after, since reads may run alongside it
+            self._invalidate_cache()
+            try:
+                return self._run_adb_uncached(command)
+            finally:
+                self._invalidate_cache()
+        
+        with self._cache_lock:
+            now = time.monotonic()
+            cached_at, result = self._cmd_cache.get(key, (0.0, None))
+            if result is not None and now - cached_at < _CMD_CACHE_TTL:
+                return result
+            generation = self._cache_generation
+        
+        result = self._run_adb_uncached(command)
+        with self._cache_lock:
+            if generation == self._cache_generation:
+                self._cmd_cache[key] = (now, result)
+        return result
+    
+    def _invalidate_cache(self):
+        """Drop cached reads and mark any read in flight as stale."""
+        with self._cache_lock:
+            self._cmd_cache.clear()
+            self._cache_generation += 1
+    
+    def _run_adb_uncached(self, command):
+        """Run an ADB command on the device"""
+        # Device shell commands reuse the persistent shell; others (pull, etc.) run one-off
+        if command.startswith("shell "):
+            result = self._shell_exec(command[len("shell "):])
+            if result is not None:
+                return result
+        
         full_command = f"{self.adb_path} -s {self.device_id} {command}"
         try:
-            result = subprocess.run(full_command.split(), capture_output=True, text=True, timeout=10)
+            result = subprocess.run(full_command.split(), capture_output=True, text=True, timeout=_ADB_TIMEOUT)
             return {
                 "success": result.returncode == 0,
                 "output": result.stdout.strip(),
@@ -28,6 +172,32 @@ class AndroidStudioTester:
         except subprocess.TimeoutExpired:
             return {"success": False, "output": "", "error": "Command timed out"}
     
+    def run_adb_batch(self, commands):
+        """Run several device shell commands in one call; return one result dict per command"""
+        batch = "; ".join(f"{command}; echo {_BATCH_DELIMITER}$?" for command in commands)
+        result = self.run_adb_command(f"shell {batch}")
+        
+        results = []
+        block = []
+        for line in result["output"].splitlines():
+            if line.startswith(_BATCH_DELIMITER) and line[len(_BATCH_DELIMITER):].isdigit():
+                output = "\n".join(block).strip()
+                success = line[len(_BATCH_DELIMITER):] == "0"
+                results.append({"success": success, "output": output, "error": "" if success else output})
+                block = []
+            else:
+                block.append(line)
+        
+        # Commands that never reported back (e.g. the device dropped) count as failed
+        failure = {"success": False, "output": "", "error": result["error"] or "No output"}
+        results.extend(failure for _ in range(len(commands) - len(results)))
+        return results
+    
+    def _record(self, test_result):
+        """Append a test result; tests may run on several threads"""
+        with self._results_lock:
+            self.test_results.append(test_result)
+    
     def test_device_connection(self):
         """Test basic device connection"""
         print("🔗 Testing device connection...")
@@ -39,7 +209,8 @@ class AndroidStudioTester:
             "details": result["output"] if result["success"] else result["error"],
             "timestamp": datetime.now().isoformat()
         }
-        self.test_results.append(test_result)
+        self._record(test_result)
+        self._device_ok = result["success"]
         
         status = "✅ PASS" if result["success"] else "❌ FAIL"
         print(f"   {status}: {test_result['details']}")
@@ -50,16 +221,18 @@ class AndroidStudioTester:
         print("📱 Getting device information...")
         
         tests = [
-            ("Android Version", "shell getprop ro.build.version.release"),
-            ("Device Model", "shell getprop ro.product.model"),
-            ("API Level", "shell getprop ro.build.version.sdk"),
-            ("Screen Density", "shell wm density"),
-            ("Screen Size", "shell wm size")
+            ("Android Version", "getprop ro.build.version.release"),
+            ("Device Model", "getprop ro.product.model"),
+            ("API Level", "getprop ro.build.version.sdk"),
+            ("Screen Density", "wm density"),
+            ("Screen Size", "wm size")
         ]
         
+        # All properties come back from a single shell call, one delimited block per command
+        results = self.run_adb_batch([command for _, command in tests])
+        
         device_info = {}
-        for test_name, command in tests:
-            result = self.run_adb_command(command)
+        for (test_name, _), result in zip(tests, results):
             device_info[test_name] = result["output"] if result["success"] else "Unknown"
             
             test_result = {
@@ -68,13 +241,18 @@ class AndroidStudioTester:
                 "details": result["output"],
                 "timestamp": datetime.now().isoformat()
             }
-            self.test_results.append(test_result)
+            self._record(test_result)
             
             status = "✅" if result["success"] else "❌"
             print(f"   {status} {test_name}: {device_info[test_name]}")
         
         return device_info
     
+    def get_current_focus(self):
+        """Return the focus poll result and the focused (package, activity), or None if unparsable"""
+        result = self.run_adb_command(_FOCUS_COMMAND)
+        return result, _parse_focus(result.get("output", ""))
+    
     def test_app_operations(self):
         """Test app launching and navigation"""
         print("🚀 Testing app operations...")
@@ -85,8 +263,8 @@ class AndroidStudioTester:
         time.sleep(2)
         
         # Check current focus
-        focus_result = self.run_adb_command("shell dumpsys window | grep mCurrentFocus")
-        settings_launched = "com.android.settings" in focus_result.get("output", "")
+        focus_result, focus = self.get_current_focus()
+        settings_launched = focus is not None and focus[0] == "com.android.settings"
         
         test_result = {
             "test": "Settings App Launch",
@@ -94,7 +272,7 @@ class AndroidStudioTester:
             "details": focus_result["output"],
             "timestamp": datetime.now().isoformat()
         }
-        self.test_results.append(test_result)
+        self._record(test_result)
         
         status = "✅ PASS" if settings_launched else "❌ FAIL"
         print(f"   {status}: Settings app launch")
@@ -104,8 +282,8 @@ class AndroidStudioTester:
         wifi_result = self.run_adb_command("shell am start -a android.settings.WIFI_SETTINGS")
         time.sleep(2)
         
-        focus_result = self.run_adb_command("shell dumpsys window | grep mCurrentFocus")
-        wifi_opened = "WifiSettingsActivity" in focus_result.get("output", "")
+        focus_result, focus = self.get_current_focus()
+        wifi_opened = focus is not None and focus[1].endswith("WifiSettingsActivity")
         
         test_result = {
             "test": "WiFi Settings Navigation",
@@ -113,7 +291,7 @@ class AndroidStudioTester:
             "details": focus_result["output"],
             "timestamp": datetime.now().isoformat()
         }
-        self.test_results.append(test_result)
+        self._record(test_result)
         
         status = "✅ PASS" if wifi_opened else "❌ FAIL"
         print(f"   {status}: WiFi settings navigation")
@@ -133,7 +311,7 @@ class AndroidStudioTester:
             "details": "Tap executed" if tap_result["success"] else tap_result["error"],
             "timestamp": datetime.now().isoformat()
         }
-        self.test_results.append(test_result)
+        self._record(test_result)
         
         # Test text input
         text_result = self.run_adb_command("shell input text 'Test Input'")
@@ -144,7 +322,7 @@ class AndroidStudioTester:
             "details": "Text input executed" if text_result["success"] else text_result["error"],
             "timestamp": datetime.now().isoformat()
         }
-        self.test_results.append(test_result)
+        self._record(test_result)
         
         # Test key press (back button)
         key_result = self.run_adb_command("shell input keyevent KEYCODE_BACK")
@@ -155,7 +333,7 @@ class AndroidStudioTester:
             "details": "Back key pressed" if key_result["success"] else key_result["error"],
             "timestamp": datetime.now().isoformat()
         }
-        self.test_results.append(test_result)
+        self._record(test_result)
         
         interaction_success = all([tap_result["success"], text_result["success"], key_result["success"]])
         status = "✅ PASS" if interaction_success else "❌ FAIL"
@@ -167,33 +345,49 @@ class AndroidStudioTester:
         """Test screenshot functionality"""
         print("📸 Testing screenshot capability...")
         
-        # Take screenshot
-        screenshot_result = self.run_adb_command("shell screencap -p /sdcard/test_screenshot.png")
-        
-        if screenshot_result["success"]:
-            # Pull screenshot
-            pull_result = self.run_adb_command("pull /sdcard/test_screenshot.png ./android_studio_test_screenshot.png")
-            success = pull_result["success"]
-        else:
-            success = False
+        # Take screenshot, streamed straight to the local file
+        success = self._screencap("./android_studio_test_screenshot.png")
         
         test_result = {
             "test": "Screenshot Capability",
             "success": success,
-            "details": "Screenshot taken and pulled" if success else "Screenshot failed",
+            "details": "Screenshot captured" if success else "Screenshot failed",
             "timestamp": datetime.now().isoformat()
         }
-        self.test_results.append(test_result)
+        self._record(test_result)
         
         status = "✅ PASS" if success else "❌ FAIL"
         print(f"   {status}: Screenshot capability")
         
         return success
     
+    def _screencap(self, local_path):
+        """Stream a PNG screenshot into local_path over exec-out; True if one arrived"""
+        try:
+            with open(local_path, "wb") as f:
+                result = subprocess.run(
+                    [self.adb_path, "-s", self.device_id, "exec-out", "screencap", "-p"],
+                    stdout=f, stderr=subprocess.DEVNULL, timeout=_ADB_TIMEOUT
+                )
+            return result.returncode == 0 and os.path.getsize(local_path) > 0
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+    
     def run_qa_system_test(self):
         """Test integration with our QA system"""
         print("🤖 Testing QA system integration...")
         
+        if not self._device_ok:
+            # A real-device AndroidEnv would only import its stack to fail connecting
+            self._record({
+                "test": "QA System Integration",
+                "success": False,
+                "details": "Skipped: no device connection",
+                "timestamp": datetime.now().isoformat()
+            })
+            print("   ⏭️  SKIP: no device connection")
+            return False
+        
         # Import our QA system
         try:
             import sys
@@ -216,7 +410,7 @@ class AndroidStudioTester:
                 "details": f"AndroidEnv initialized, reset: {obs['status']}, step: {result['status']}",
                 "timestamp": datetime.now().isoformat()
             }
-            self.test_results.append(test_result)
+            self._record(test_result)
             
             print(f"   ✅ PASS: QA system integration working")
             return True
@@ -228,7 +422,7 @@ class AndroidStudioTester:
                 "details": f"Error: {str(e)}",
                 "timestamp": datetime.now().isoformat()
             }
-            self.test_results.append(test_result)
+            self._record(test_result)
             
             print(f"   ❌ FAIL: QA system integration - {str(e)}")
             return False
@@ -237,8 +431,21 @@ class AndroidStudioTester:
         """Generate comprehensive test report"""
         print("\n📊 Generating test report...")
         
+        # One pass over the results tallies passes and renders both reports' entries
+        passed_tests = 0
+        json_items = []
+        markdown_items = []
+        for test in self.test_results:
+            if test["success"]:
+                passed_tests += 1
+                status = "✅ PASS"
+            else:
+                status = "❌ FAIL"
+            # Nested two levels deep, as json.dump(report, indent=2) would place it
+            json_items.append("\n    " + json.dumps(test, indent=2).replace("\n", "\n    "))
+            markdown_items.append(f"- **{test['test']}**: {status} - {test['details']}\n")
+        
         total_tests = len(self.test_results)
-        passed_tests = sum(1 for test in self.test_results if test["success"])
         success_rate = (passed_tests / total_tests) * 100 if total_tests > 0 else 0
         
         report = {
@@ -253,9 +460,16 @@ class AndroidStudioTester:
             "test_results": self.test_results
         }
         
-        # Save JSON report
+        # Save JSON report; the session header is dumped whole and its closing brace
+        # reopened so the entries above can follow without re-encoding the list
         with open('android_studio_test_report.json', 'w') as f:
-            json.dump(report, f, indent=2)
+            f.write(json.dumps({"test_session": report["test_session"]}, indent=2)[:-2])
+            f.write(',\n  "test_results": [')
+            if json_items:
+                f.write(",".join(json_items))
+                f.write("\n  ]\n}")
+            else:
+                f.write("]\n}")
         
         # Generate markdown report
         markdown_report = f"""# Android Studio Integration Test Report
@@ -271,12 +485,9 @@ class AndroidStudioTester:
 ## Test Results
 """
         
-        for test in self.test_results:
-            status = "✅ PASS" if test["success"] else "❌ FAIL"
-            markdown_report += f"- **{test['test']}**: {status} - {test['details']}\n"
-        
         with open('android_studio_test_report.md', 'w') as f:
             f.write(markdown_report)
+            f.writelines(markdown_items)
         
         print(f"📋 Report saved: android_studio_test_report.json")
         print(f"📋 Report saved: android_studio_test_report.md")
@@ -284,11 +495,30 @@ class AndroidStudioTester:
         
         return report
     
+    def _run_test(self, test_func):
+        """Run one test category; False if it fails or raises"""
+        try:
+            return bool(test_func())
+        except Exception as e:
+            print(f"❌ Test failed with exception: {str(e)}")
+            return False
+    
     def run_all_tests(self):
         """Run comprehensive Android Studio integration tests"""
         print("🚀 Starting Android Studio Integration Tests")
         print("=" * 60)
         
+        if not os.path.isfile(self.adb_path):
+            # Every test would just fail to launch adb; report that once instead
+            self._record({
+                "test": "ADB Availability",
+                "success": False,
+                "details": f"adb not found at {self.adb_path}",
+                "timestamp": datetime.now().isoformat()
+            })
+            print(f"❌ adb not found at {self.adb_path}; skipping device tests")
+            return self.generate_report()
+        
         # Run all test categories
         tests = [
             self.test_device_connection,
@@ -299,15 +529,19 @@ class AndroidStudioTester:
             self.run_qa_system_test
         ]
         
-        overall_success = True
-        for test_func in tests:
-            try:
-                result = test_func()
-                if not result:
-                    overall_success = False
-            except Exception as e:
-                print(f"❌ Test failed with exception: {str(e)}")
-                overall_success = False
+        # Once the device answers, the independent tests run on worker threads while the
+        # UI-driving tests run in order here; without a device everything runs in order
+        results = [self._run_test(tests[0])]
+        if results[0]:
+            parallel = [t for t in tests[1:] if t.__name__ not in self._exclusive]
+            serial = [t for t in tests[1:] if t.__name__ in self._exclusive]
+            with ThreadPoolExecutor(max_workers=len(parallel)) as pool:
+                futures = [pool.submit(self._run_test, t) for t in parallel]
+                results.extend(self._run_test(t) for t in serial)
+                results.extend(f.result() for f in futures)
+        else:
+            results.extend(self._run_test(t) for t in tests[1:])
+        overall_success = all(results)
         
         print("\n" + "=" * 60)
         final_status = "✅ ALL TESTS PASSED" if overall_success else "⚠️  SOME TESTS FAILED"
@@ -320,4 +554,7 @@ class AndroidStudioTester:
 
 if __name__ == "__main__":
     tester = AndroidStudioTester()
-    report = tester.run_all_tests()
+    try:
+        report = tester.run_all_tests()
+    finally:
+        tester.close()
@@ -14,12 +14,31 @@ from new_executor_agent import EnhancedExecutorAgent
 from verifier_agent import VerifierAgent
 from android_env_wrapper import AndroidEnv
 import time
+import logging
+
+logger = logging.getLogger("qa_supervisor")
+_EMPTY = {}  # Shared read-only default for results without camera details
+
+def _camera_stats(execution_results):
+    """Tally step successes, saved photos and permission handling in one pass."""
+    success = photos = 0
+    permission_any = False
+    for r in execution_results:
+        if r.get('success'):
+            success += 1
+        camera_result = r.get('camera_specific_result') or _EMPTY
+        if camera_result.get('photo_saved'):
+            photos += 1
+        if camera_result.get('permission_granted'):
+            permission_any = True
+    return {"success": success, "photos": photos, "permission_any": permission_any,
+            "total": len(execution_results)}
 
 def test_camera_photo_capture():
     """Test camera app photo capture functionality with full monitoring."""
     
-    print("📸 Testing: Camera App Photo Capture")
-    print("=" * 50)
+    logger.info("📸 Testing: Camera App Photo Capture")
+    logger.info("%s", "=" * 50)
     
     # Initialize agents
     supervisor = SupervisorAgent(enable_visual_traces=True, enable_ai_analysis=True)
@@ -33,11 +52,11 @@ def test_camera_photo_capture():
         "Test camera app photo capture functionality", 
         "camera_photo"
     )
-    print(f"📋 Session ID: {session_id}")
+    logger.info("📋 Session ID: %s", session_id)
     
     try:
         # Phase 1: Planning
-        print("\n📋 Phase 1: Test Planning")
+        logger.info("\n📋 Phase 1: Test Planning")
         plan_start = time.time()
         plan = planner.generate_test_plan("Test camera app photo capture functionality")
         plan_time = time.time() - plan_start
@@ -53,24 +72,29 @@ def test_camera_photo_capture():
             "task_type": "camera_photo"
         })
         
-        print(f"✅ Plan generated: {len(plan.get('steps', []))} steps")
-        print(f"🎯 Subgoals: {len(plan.get('subgoals', []))}")
+        logger.info("✅ Plan generated: %d steps", len(plan.get('steps', [])))
+        logger.info("🎯 Subgoals: %d", len(plan.get('subgoals', [])))
         
         # Show generated subgoals
-        print("\n🎯 Camera Test Subgoals:")
+        logger.info("\n🎯 Camera Test Subgoals:")
         for i, subgoal in enumerate(plan.get('subgoals', []), 1):
-            print(f"  {i}. {subgoal.get('description', 'Unknown subgoal')}")
+            logger.info("  %d. %s", i, subgoal.get('description', 'Unknown subgoal'))
         
         # Phase 2: Execute key steps with monitoring
-        print("\n⚡ Phase 2: Execution (First 5 steps)")
+        logger.info("\n⚡ Phase 2: Execution (First 5 steps)")
         execution_results = []
         
+        # Bind the per-step calls once for the loop
+        sv_record = supervisor.record_agent_decision
+        sv_capture = supervisor.capture_environment_state
+        env_get_state = env.get_state
+        
         for i, step in enumerate(plan.get('steps', [])[:5], 1):
-            print(f"\n📝 Step {i}: {step.get('description', 'Unknown step')}")
+            logger.info("\n📝 Step %d: %s", i, step.get('description', 'Unknown step'))
             
             # Get environment state
-            env_state = env.get_state()
-            supervisor.capture_environment_state(env_state)
+            env_state = env_get_state()
+            sv_capture(env_state)
             
             # Execute step
             exec_start = time.time()
@@ -78,7 +102,7 @@ def test_camera_photo_capture():
             exec_time = time.time() - exec_start
             
             # Record execution
-            supervisor.record_agent_decision("ExecutorAgent", {
+            sv_record("ExecutorAgent", {
                 "action": "execute_step",
                 "step_id": step.get("step_id"),
                 "step_description": step.get("description"),
@@ -87,7 +111,7 @@ def test_camera_photo_capture():
                 "target": step.get("target"),
                 "action_type": step.get("action"),
                 "camera_specific": True
-            })
+            }, kind=exec_result.get("failure_type"))
             
             # Verify step
             verify_start = time.time()
@@ -99,7 +123,7 @@ def test_camera_photo_capture():
             verify_time = time.time() - verify_start
             
             # Record verification
-            supervisor.record_agent_decision("VerifierAgent", {
+            sv_record("VerifierAgent", {
                 "action": "verify_step",
                 "step_id": step.get("step_id"),
                 "verification_status": verification.get("verification_status"),
@@ -121,10 +145,10 @@ def test_camera_photo_capture():
             # Show result
             status_emoji = "✅" if step_success else "❌"
             result_text = "PASS" if step_success else "FAIL"
-            print(f"{status_emoji} Result: {result_text}")
+            logger.info("%s Result: %s", status_emoji, result_text)
             
             if not step_success and "capture" in step.get("description", "").lower():
-                print("   📷 Camera capture issue detected - storage or focus problem")
+                logger.info("   📷 Camera capture issue detected - storage or focus problem")
             
             execution_results.append({
                 "step": step,
@@ -141,7 +165,7 @@ def test_camera_photo_capture():
             time.sleep(0.3)  # Brief pause between steps
         
         # Phase 3: Comprehensive Evaluation
-        print("\n📊 Phase 3: Camera Test Evaluation")
+        logger.info("\n📊 Phase 3: Camera Test Evaluation")
         
         final_results = execution_results
         evaluation = supervisor.generate_comprehensive_evaluation(
@@ -149,39 +173,38 @@ def test_camera_photo_capture():
             final_results
         )
         
-        print(f"✅ Camera evaluation completed")
-        print(f"🤖 AI Analysis: {'Available' if evaluation.get('ai_analysis') else 'Not available'}")
-        print(f"📊 Metrics calculated: {len(evaluation.get('metrics', {}))}")
-        print(f"📸 Visual frames: {evaluation.get('visual_traces', {}).get('total_frames', 0)}")
+        logger.info("✅ Camera evaluation completed")
+        logger.info("🤖 AI Analysis: %s", 'Available' if evaluation.get('ai_analysis') else 'Not available')
+        logger.info("📊 Metrics calculated: %d", len(evaluation.get('metrics', {})))
+        logger.info("📸 Visual frames: %s", evaluation.get('visual_traces', {}).get('total_frames', 0))
+        
+        # Camera results are tallied once and shared by the metrics, summary and caller
+        stats = _camera_stats(execution_results)
+        photo_captures = stats["photos"]
+        permission_handled = stats["permission_any"]
         
         # Show camera-specific metrics
         if evaluation.get('metrics'):
             metrics = evaluation['metrics']
-            print(f"\n📈 Camera Test Metrics:")
-            print(f"  • Photo Capture Success: {sum(1 for r in execution_results if r.get('camera_specific_result', {}).get('photo_saved', False))}/{len(execution_results)} attempts")
-            print(f"  • Permission Handling: {'SUCCESS' if any(r.get('camera_specific_result', {}).get('permission_granted') for r in execution_results) else 'NOT TESTED'}")
-            print(f"  • App Responsiveness: {metrics.get('system_reliability', 0):.1%}")
-            print(f"  • Recovery Rate: {metrics.get('recovery_rate', 0):.1%}")
+            logger.info("\n📈 Camera Test Metrics:")
+            logger.info("  • Photo Capture Success: %d/%d attempts", photo_captures, stats["total"])
+            logger.info("  • Permission Handling: %s", 'SUCCESS' if permission_handled else 'NOT TESTED')
+            logger.info("  • App Responsiveness: %.1f%%", metrics.get('system_reliability', 0) * 100)
+            logger.info("  • Recovery Rate: %.1f%%", metrics.get('recovery_rate', 0) * 100)
         
         # Show AI recommendations for camera testing
         if evaluation.get('ai_analysis', {}).get('recommendations'):
             recommendations = evaluation['ai_analysis']['recommendations']
-            print(f"\n🤖 Camera-Specific AI Recommendations ({len(recommendations)}):")
+            logger.info("\n🤖 Camera-Specific AI Recommendations (%d):", len(recommendations))
             for i, rec in enumerate(recommendations[:3], 1):
                 priority = rec.get('priority', 'unknown')
                 suggestion = rec.get('suggestion', 'Unknown recommendation')
-                print(f"  {i}. [{priority.upper()}] {suggestion}")
-        
-        # Camera test summary
-        photo_captures = sum(1 for r in execution_results 
-                           if r.get('camera_specific_result', {}).get('photo_saved', False))
-        permission_handled = any(r.get('camera_specific_result', {}).get('permission_granted') 
-                               for r in execution_results)
+                logger.info("  %d. [%s] %s", i, priority.upper(), suggestion)
         
-        print(f"\n📷 Camera Functionality Summary:")
-        print(f"  • Photos Captured: {photo_captures}")
-        print(f"  • Permissions: {'Handled' if permission_handled else 'Not Required'}")
-        print(f"  • Test Coverage: App launch, capture, storage validation")
+        logger.info("\n📷 Camera Functionality Summary:")
+        logger.info("  • Photos Captured: %d", photo_captures)
+        logger.info("  • Permissions: %s", 'Handled' if permission_handled else 'Not Required')
+        logger.info("  • Test Coverage: App launch, capture, storage validation")
         
         return {
             "session_id": session_id,
@@ -191,47 +214,52 @@ def test_camera_photo_capture():
             "camera_metrics": {
                 "photos_captured": photo_captures,
                 "permission_handled": permission_handled,
-                "steps_executed": len(execution_results)
+                "steps_executed": stats["total"],
+                "steps_successful": stats["success"]
             },
             "status": "completed"
         }
         
     except Exception as e:
-        print(f"❌ Error during camera test: {e}")
+        logger.error("❌ Error during camera test: %s", e)
         return {"status": "error", "error": str(e)}
     
     finally:
         # End supervision session
         try:
             supervisor.end_supervision_session()
-        except:
-            pass
+        except Exception as e:
+            logger.debug("end_session failed: %s", e)
 
 if __name__ == "__main__":
+    # Harness output goes to stdout; raise the level to WARNING for quiet runs
+    logging.basicConfig(stream=sys.stdout, format="%(message)s")
+    logger.setLevel(logging.INFO)
+    
     result = test_camera_photo_capture()
     
-    print("\n" + "=" * 50)
-    print("📸 CAMERA APP TEST SUMMARY")
-    print("=" * 50)
+    logger.info("\n%s", "=" * 50)
+    logger.info("📸 CAMERA APP TEST SUMMARY")
+    logger.info("%s", "=" * 50)
     
     status = result.get('status', 'unknown')
-    print(f"📋 Status: {status.upper()}")
+    logger.info("📋 Status: %s", status.upper())
     
     if result.get('execution_results'):
-        success_count = sum(1 for r in result['execution_results'] if r.get('success'))
-        total_count = len(result['execution_results'])
-        print(f"📊 Steps: {success_count}/{total_count} successful")
-        print(f"📈 Success Rate: {success_count/total_count:.1%}")
+        success_count = result['camera_metrics']['steps_successful']
+        total_count = result['camera_metrics']['steps_executed']
+        logger.info("📊 Steps: %d/%d successful", success_count, total_count)
+        logger.info("📈 Success Rate: %.1f%%", success_count / total_count * 100)
     
     if result.get('camera_metrics'):
         metrics = result['camera_metrics']
-        print(f"📷 Photos Captured: {metrics.get('photos_captured', 0)}")
-        print(f"🔒 Permissions: {metrics.get('permission_handled', False)}")
-        print(f"⚡ Steps Executed: {metrics.get('steps_executed', 0)}")
+        logger.info("📷 Photos Captured: %d", metrics.get('photos_captured', 0))
+        logger.info("🔒 Permissions: %s", metrics.get('permission_handled', False))
+        logger.info("⚡ Steps Executed: %d", metrics.get('steps_executed', 0))
     
     if result.get('evaluation'):
-        print("🤖 AI Analysis: COMPLETED")
-        print("📊 Evaluation Reports: GENERATED")
+        logger.info("🤖 AI Analysis: COMPLETED")
+        logger.info("📊 Evaluation Reports: GENERATED")
     
-    print("✅ Camera Test: COMPREHENSIVE ANALYSIS COMPLETE")
-    print("=" * 50)
+    logger.info("✅ Camera Test: COMPREHENSIVE ANALYSIS COMPLETE")
+    logger.info("%s", "=" * 50)
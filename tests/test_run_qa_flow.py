@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test: QAFlowManager.run_many planning look-ahead
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import asyncio
+import threading
+import time
+
+from run_qa_flow import QAFlowManager
+
+def test_run_many_never_overlaps_planning_after_failure():
+    """A failed first plan must not leave two generate_test_plan calls in flight."""
+    manager = QAFlowManager("settings_wifi")
+    generate = manager.planner.generate_test_plan
+    lock = threading.Lock()
+    calls = []
+    in_flight = 0
+    max_in_flight = 0
+    
+    def tracked(goal, context=None):
+        nonlocal in_flight, max_in_flight
+        with lock:
+            calls.append(goal)
+            first = len(calls) == 1
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        try:
+            time.sleep(0.05)  # Widen the window an overlapping call would land in
+            if first:
+                raise RuntimeError("planner unavailable")
+            return generate(goal, context)
+        finally:
+            with lock:
+                in_flight -= 1
+    
+    manager.planner.generate_test_plan = tracked
+    goals = ["Test turning Wi-Fi on and off", "Open Wi-Fi settings"]
+    sessions = asyncio.run(manager.run_many(goals))
+    
+    assert max_in_flight == 1
+    assert len(sessions) == len(goals)
+    # The failed goal was planned again inline, then the next goal once
+    assert calls == [goals[0], goals[0], goals[1]]
+
+if __name__ == "__main__":
+    test_run_many_never_overlaps_planning_after_failure()
+    print("✅ run_many planning test passed")